@@ -0,0 +1,94 @@
+"""
+Extractions/sec of the shared field extractor vs. the per-service code it replaced
+
+Run from the backend directory:
+    python -m benchmarks.bench_extraction --seconds 2
+"""
+import re
+import time
+import logging
+import argparse
+from services.field_extraction import extract_single_field
+
+SAMPLES = [
+    ("candidate_name", "my name is Rahul Sharma"),
+    ("years_of_experience", "I have 7 years of experience"),
+    ("current_designation", "I work as a senior data engineer"),
+    ("address", "I live at 42 mg road, bangalore"),
+    ("email", "my email is rahul dot sharma at gmail dot com"),
+    ("email", "contact me at priya underscore k at yahoo dot co dot in"),
+]
+
+def legacy_clean_email(text):
+    text = text.lower().strip()
+    for pattern, replacement in [
+        (r'\b(at the rate|at the symbol|at sign)\b', '@'),
+        (r'\bat\b', '@'),
+        (r'\b(dot|period|full stop|point)\b', '.'),
+        (r'\bunderscore\b', '_'),
+        (r'\b(dash|hyphen)\b', '-'),
+        (r'\s+', ''),
+        (r'@+', '@'),
+    ]:
+        text = re.sub(pattern, replacement, text)
+    return text
+
+def legacy_extract_single_field(transcript, field, language='en'):
+    """The extractor as it was duplicated in each service: patterns rebuilt and compiled per call"""
+    patterns = {
+        "email": [
+            r"(?:my email is|email is|email|mail id|contact me at)\s+([\w\s@.]+)",
+            r"([\w\s.]+@[\w\s.]+)"
+        ],
+        "candidate_name": [
+            r"(?:my name is|i am|name is|this is|i'm|im)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)",
+            r"^([A-Z][a-z]+\s+[A-Z][a-z]+)$",
+            r"([A-Z][a-z]+ [A-Z][a-z]+)"
+        ],
+        "years_of_experience": [
+            r"(\d+)\s*(?:years|yrs|year|y)",
+            r"experience of (\d+)\s*years",
+            r"(\d+)\s*\+?\s*years? exp",
+            r"(\d+)\s+yoe",
+            r"(\d+)\s+years of experience"
+        ],
+        "current_designation": [
+            r"(?:i am a|my designation is|i work as|i'm a|role is|as a)\s+([a-z ]+)",
+            r"^([a-z ]+)$"
+        ],
+        "address": [
+            r"(?:i live at|my address is|address is|located at|residing at)\s+([a-z0-9, ]+)",
+            r"^([a-z0-9, ]+)$"
+        ]
+    }
+    for pattern in patterns.get(field, []):
+        match = re.search(pattern, transcript, re.IGNORECASE)
+        if match:
+            value = match.group(1).strip()
+            return legacy_clean_email(value) if field == "email" else value
+    return transcript
+
+def rate(fn, seconds):
+    """Extractions per second over the sample set"""
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for field, transcript in SAMPLES:
+            fn(transcript, field, 'en')
+        count += len(SAMPLES)
+    return count / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    before = rate(legacy_extract_single_field, args.seconds)
+    after = rate(extract_single_field, args.seconds)
+    print(f"before: {before:10.0f} extractions/s")
+    print(f"after:  {after:10.0f} extractions/s")
+    print(f"ratio:  {after / before:10.2f}x")
+
+if __name__ == "__main__":
+    main()
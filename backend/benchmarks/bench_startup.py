@@ -0,0 +1,77 @@
+"""
+API start-up cost with lazily imported engines
+
+For each STT_ENGINES setting, a fresh process imports main and reports the
+time and resident memory at that point, which heavy modules it pulled in,
+and then what importing every enabled engine up front (what main used to
+do) would have added.
+
+Run from the backend directory:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --engines vosk whisper,vosk google,whisper,vosk
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+HEAVY_MODULES = ["torch", "whisper", "vosk", "pyaudio", "sounddevice", "speech_recognition"]
+
+PROBE = """
+import sys, json, time, resource, logging
+logging.disable(logging.CRITICAL)
+
+def rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 1024)
+
+started = time.perf_counter()
+import main
+result = {
+    "import_main_s": time.perf_counter() - started,
+    "import_main_rss_mb": rss_mb(),
+    "heavy_modules": [name for name in %(heavy)r if name in sys.modules],
+    "engines": {},
+}
+from services import get_engine, ENABLED_ENGINES
+for engine in ENABLED_ENGINES:
+    started = time.perf_counter()
+    try:
+        get_engine(engine)
+        result["engines"][engine] = time.perf_counter() - started
+    except ImportError as e:
+        result["engines"][engine] = str(e)
+result["eager_rss_mb"] = rss_mb()
+print(json.dumps(result))
+"""
+
+def measure(engines):
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE % {"heavy": HEAVY_MODULES}],
+        env={**os.environ, "STT_ENGINES": engines}, capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", default=["google,whisper,vosk", "google", "whisper", "vosk"],
+                        help="STT_ENGINES values to measure")
+    args = parser.parse_args()
+
+    for engines in args.engines:
+        result = measure(engines)
+        eager = result["import_main_s"]
+        print(f"STT_ENGINES={engines}")
+        print(f"  import main       {result['import_main_s']:7.2f}s  {result['import_main_rss_mb']:7.1f} MB  heavy modules: {', '.join(result['heavy_modules']) or 'none'}")
+        for engine, cost in result["engines"].items():
+            if isinstance(cost, str):
+                print(f"  + {engine:15} not installed ({cost})")
+            else:
+                eager += cost
+                print(f"  + {engine:15} {cost:7.2f}s")
+        print(f"  eager imports     {eager:7.2f}s  {result['eager_rss_mb']:7.1f} MB")
+
+if __name__ == "__main__":
+    main()
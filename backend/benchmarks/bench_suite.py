@@ -0,0 +1,206 @@
+"""
+Offline benchmark of the local engines and the field extractors
+
+Transcribes WAV fixtures with each engine (no microphone), then measures
+the extractors, and writes the results as JSON so releases can be compared.
+A fixture may have a reference transcript next to it (clip.wav + clip.txt),
+in which case the word error rate is reported too.
+
+The committed fixtures (benchmarks/fixtures) are short form dictations
+synthesised with espeak-ng (en-us voice, 160 words per minute) and saved
+as 16 kHz mono 16-bit WAV. They never change, so results stay comparable
+between releases, but synthetic speech is easier than real callers: add
+real recordings to the directory for a representative WER.
+
+Every engine runs in its own child process so that its model load time and
+peak RSS are not mixed up with the other engine's.
+
+Run from the backend directory:
+    python -m benchmarks.bench_suite --fixtures benchmarks/fixtures --output results.json
+    python -m benchmarks.bench_suite --fixtures benchmarks/fixtures --compare baseline.json
+
+With --compare the exit status is 1 when any metric is worse than the
+baseline by more than --tolerance.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+import platform
+import resource
+import importlib
+import subprocess
+import multiprocessing
+import numpy as np
+from services.audio_utils import decode_audio, SAMPLE_RATE
+from services.domain_index import edit_distance
+
+# Metrics compared against a baseline, and whether higher is better
+METRICS = {
+    "load_time_s": False,
+    "latency_p50_ms": False,
+    "latency_p90_ms": False,
+    "latency_p99_ms": False,
+    "rtf": False,
+    "peak_rss_mb": False,
+    "wer": False,
+    "extractions_per_s": True,
+}
+
+def load_fixtures(directory):
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        with open(path, "rb") as f:
+            samples = decode_audio(f.read())
+        reference_path = os.path.splitext(path)[0] + ".txt"
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path) as f:
+                reference = f.read().strip()
+        fixtures.append({"name": os.path.basename(path), "samples": samples, "reference": reference})
+    return fixtures
+
+def words(text):
+    return "".join(c if c.isalnum() or c.isspace() else " " for c in text.lower()).split()
+
+def word_error_rate(pairs):
+    """Corpus WER over (reference, hypothesis) pairs"""
+    errors = sum(edit_distance(words(reference), words(hypothesis)) for reference, hypothesis in pairs)
+    total = sum(len(words(reference)) for reference, _ in pairs)
+    return errors / total if total else None
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 1024)
+
+def bench_engine(engine, fixtures_dir, language, repeat):
+    """Runs in a fresh process: load one engine and transcribe every fixture"""
+    logging.disable(logging.INFO)
+    fixtures = load_fixtures(fixtures_dir)
+    service = importlib.import_module(f"services.{engine}_service")
+    load = service.load_model if engine == "whisper" else lambda: service.load_model(language)
+    transcribe = lambda samples: service.transcribe_audio(samples, language=language)[0]
+
+    start = time.perf_counter()
+    load()
+    load_time = time.perf_counter() - start
+    transcribe(fixtures[0]["samples"])  # warm-up, not measured
+
+    latencies = []
+    audio_seconds = 0.0
+    pairs = []
+    for _ in range(repeat):
+        for fixture in fixtures:
+            start = time.perf_counter()
+            transcript = transcribe(fixture["samples"])
+            latencies.append(time.perf_counter() - start)
+            audio_seconds += fixture["samples"].size / SAMPLE_RATE
+            if fixture["reference"] is not None:
+                pairs.append((fixture["reference"], transcript))
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "load_time_s": round(load_time, 3),
+        "clips": len(latencies),
+        "latency_p50_ms": round(float(np.percentile(latencies_ms, 50)), 1),
+        "latency_p90_ms": round(float(np.percentile(latencies_ms, 90)), 1),
+        "latency_p99_ms": round(float(np.percentile(latencies_ms, 99)), 1),
+        "rtf": round(sum(latencies) / audio_seconds, 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "wer": round(word_error_rate(pairs), 4) if pairs else None,
+    }
+
+def run_isolated(engine, args):
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(bench_engine, (engine, args.fixtures, args.language, args.repeat))
+
+def bench_extraction(seconds):
+    from benchmarks.bench_extraction import SAMPLES
+    from services.field_extraction import extract_single_field, extract_all_fields
+
+    def rate(fn):
+        count = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            fn()
+            count += 1
+        return round(count * len(SAMPLES) / (time.perf_counter() - start), 1)
+
+    forms = [transcript for _, transcript in SAMPLES]
+    return {
+        "single_field": {"extractions_per_s": rate(lambda: [extract_single_field(t, f, "en") for f, t in SAMPLES])},
+        "whole_form": {"extractions_per_s": rate(lambda: [extract_all_fields(t, "en") for t in forms])},
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(results, baseline, tolerance):
+    """Return a line for every metric that regressed by more than tolerance"""
+    regressions = []
+    for section in ("engines", "extraction"):
+        for name, metrics in results.get(section, {}).items():
+            old = baseline.get(section, {}).get(name, {})
+            for metric, higher_is_better in METRICS.items():
+                before, after = old.get(metric), metrics.get(metric)
+                if not before or after is None:
+                    continue
+                change = (after - before) / before
+                if (-change if higher_is_better else change) > tolerance:
+                    regressions.append(f"{section}.{name}.{metric}: {before} -> {after} ({change:+.1%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default="benchmarks/fixtures", help="Directory of WAV fixtures (16 kHz mono 16-bit)")
+    parser.add_argument("--engines", default="whisper,vosk", help="Comma-separated engines, or '' for extraction only")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the fixtures per engine")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Duration of each extraction benchmark")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    engines = [engine.strip() for engine in args.engines.split(",") if engine.strip()]
+    if engines and not glob.glob(os.path.join(args.fixtures, "*.wav")):
+        parser.error(f"No WAV fixtures in {args.fixtures}")
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "config": {"whisper_model": os.getenv("WHISPER_MODEL", "small"), "language": args.language},
+        "engines": {},
+        "extraction": bench_extraction(args.seconds),
+    }
+    for engine in engines:
+        print(f"Benchmarking {engine}...", file=sys.stderr)
+        results["engines"][engine] = run_isolated(engine, args)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
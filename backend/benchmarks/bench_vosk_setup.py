@@ -0,0 +1,55 @@
+"""
+Per-request setup cost of Vosk: fresh recognizer and PyAudio vs. the pooled ones
+
+Measures what every call used to pay before any audio was processed
+(KaldiRecognizer + SetWords, PyAudio() + terminate()) against taking a
+recognizer from the pool and reusing the shared PyAudio instance.
+
+Run from the backend directory (needs the Vosk model and PortAudio):
+    python -m benchmarks.bench_vosk_setup --language en --rounds 50
+"""
+import time
+import logging
+import argparse
+import pyaudio
+from services import vosk_service
+
+def per_call_ms(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--skip-audio", action="store_true", help="Skip the PyAudio part (no sound devices)")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    vosk_service.load_model(args.language)  # model load is not part of the per-request cost
+    silence = bytes(3200)
+
+    def fresh_recognizer():
+        recognizer = vosk_service.create_recognizer(args.language)
+        recognizer.AcceptWaveform(silence)
+        recognizer.FinalResult()
+
+    def pooled_recognizer():
+        with vosk_service.recognizers.recognizer(args.language) as recognizer:
+            recognizer.AcceptWaveform(silence)
+            recognizer.FinalResult()
+
+    before = per_call_ms(fresh_recognizer, args.rounds)
+    after = per_call_ms(pooled_recognizer, args.rounds)
+    print(f"recognizer  new: {before:8.2f} ms  pooled: {after:8.2f} ms  saved: {before - after:8.2f} ms/request")
+
+    if not args.skip_audio:
+        before = per_call_ms(lambda: pyaudio.PyAudio().terminate(), args.rounds)
+        vosk_service.get_audio()
+        after = per_call_ms(vosk_service.get_audio, args.rounds)
+        print(f"pyaudio     new: {before:8.2f} ms  shared: {after:8.2f} ms  saved: {before - after:8.2f} ms/request")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Throughput of one-at-a-time Whisper decoding vs. the micro-batching scheduler
+
+Run from the backend directory:
+    python -m benchmarks.bench_whisper_batching --clips 32 --concurrency 8 fixtures/*.wav
+
+Without WAV files, synthetic 3 s clips are used (timings only, the
+transcripts are meaningless).
+"""
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import whisper
+from services.audio_utils import decode_audio, to_float32
+from services.whisper_batcher import WhisperBatcher
+
+def load_clips(paths, count, seconds=3.0):
+    if paths:
+        audio = [to_float32(decode_audio(open(path, "rb").read())) for path in paths]
+    else:
+        rng = np.random.default_rng(0)
+        audio = [(0.05 * rng.standard_normal(int(16000 * seconds))).astype(np.float32)]
+    return [audio[i % len(audio)] for i in range(count)]
+
+def sequential(model, clips, language):
+    options = whisper.DecodingOptions(language=language, fp16=False, without_timestamps=True)
+    for audio in clips:
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=model.dims.n_mels)
+        whisper.decode(model, mel.to(model.device), options)
+
+def batched(model, clips, language, concurrency, max_batch_size, max_wait_ms):
+    batcher = WhisperBatcher(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda audio: batcher.transcribe(audio, language), clips))
+    return batcher
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wav", nargs="*", help="WAV fixtures to transcribe")
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--clips", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    model = whisper.load_model(args.model)
+    clips = load_clips(args.wav, args.clips)
+    sequential(model, clips[:1], args.language)  # warm-up
+
+    start = time.perf_counter()
+    sequential(model, clips, args.language)
+    seq_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batcher = batched(model, clips, args.language, args.concurrency, args.max_batch, args.max_wait_ms)
+    batch_elapsed = time.perf_counter() - start
+
+    print(f"model={args.model} clips={len(clips)} concurrency={args.concurrency} "
+          f"max_batch={args.max_batch} max_wait_ms={args.max_wait_ms}")
+    print(f"one-at-a-time: {seq_elapsed:8.2f}s  {len(clips) / seq_elapsed:6.2f} clips/s")
+    print(f"batched:       {batch_elapsed:8.2f}s  {len(clips) / batch_elapsed:6.2f} clips/s  "
+          f"(avg batch {batcher.clips / max(batcher.batches, 1):.1f})")
+    print(f"speedup:       {seq_elapsed / batch_elapsed:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Whole-clip Whisper vs. the parallel long-audio mode (WHISPER_CHUNK_WORKERS)
+
+Joins the WAV fixtures into one long dictation (or takes --audio), then
+times model.transcribe on the whole clip against transcribe_long with
+each --workers count. The chunk workers are started and warmed up before
+the clock starts. With reference transcripts (clip.wav + clip.txt) the
+word error rate of each run is reported too, to check the stitching.
+
+Run from the backend directory:
+    python -m benchmarks.bench_whisper_chunking --fixtures benchmarks/fixtures --workers 2 4 8
+"""
+import os
+import time
+import logging
+import argparse
+import numpy as np
+from services.audio_utils import decode_audio, to_float32, SAMPLE_RATE
+from services import whisper_service, whisper_chunking
+from benchmarks.bench_suite import load_fixtures, word_error_rate
+
+def timed_run(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, text
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default="benchmarks/fixtures")
+    parser.add_argument("--audio", help="One long recording to use instead of the joined fixtures")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    reference = None
+    if args.audio:
+        with open(args.audio, "rb") as f:
+            samples = decode_audio(f.read())
+    else:
+        fixtures = load_fixtures(args.fixtures)
+        pause = np.zeros(SAMPLE_RATE // 2, dtype=np.int16)
+        samples = np.concatenate([part for fixture in fixtures for part in (fixture["samples"], pause)])
+        if all(fixture["reference"] for fixture in fixtures):
+            reference = " ".join(fixture["reference"] for fixture in fixtures)
+    audio = to_float32(samples)
+    seconds = len(audio) / SAMPLE_RATE
+
+    def report(name, elapsed, text):
+        wer = word_error_rate([(reference, text)]) if reference else None
+        print(f"{name:16}{elapsed:10.2f}s{seconds / elapsed:10.1f}x real time" + (f"   wer {wer:.3f}" if wer is not None else ""))
+
+    print(f"{seconds:.1f}s of audio, model={whisper_service.MODEL_SIZE}, {os.cpu_count()} CPUs")
+    model = whisper_service.load_model()
+    elapsed, text = timed_run(lambda: model.transcribe(audio, fp16=False, language=args.language)["text"], args.repeat)
+    report("whole clip", elapsed, text)
+
+    for workers in args.workers:
+        whisper_chunking.shutdown()
+        whisper_chunking.CHUNK_WORKERS = workers
+        # Start the workers and load their models outside the measurement
+        pool = whisper_chunking.get_executor(whisper_service.MODEL_SIZE)
+        warmups = [pool.submit(whisper_chunking.transcribe_chunk, audio[:SAMPLE_RATE], args.language) for _ in range(workers)]
+        for future in warmups:
+            future.result()
+        elapsed, text = timed_run(lambda: whisper_chunking.transcribe_long(audio, args.language, whisper_service.MODEL_SIZE), args.repeat)
+        report(f"{workers} workers", elapsed, text)
+    whisper_chunking.shutdown()
+
+if __name__ == "__main__":
+    main()
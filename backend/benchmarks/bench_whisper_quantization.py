@@ -0,0 +1,49 @@
+"""
+Float32 Whisper vs. the int8-quantised CPU mode (WHISPER_QUANTIZE=int8)
+
+Runs the bench_suite Whisper measurement once per mode, each in a fresh
+process, and compares latency, real-time factor, peak memory and word
+error rate. Give the fixtures reference transcripts (clip.wav + clip.txt)
+to get a WER.
+
+Run from the backend directory:
+    python -m benchmarks.bench_whisper_quantization --fixtures benchmarks/fixtures --threads 4
+"""
+import os
+import json
+import argparse
+from benchmarks.bench_suite import run_isolated
+
+MODES = {"float32": "", "int8": "int8"}
+COLUMNS = ["load_time_s", "latency_p50_ms", "latency_p90_ms", "rtf", "peak_rss_mb", "wer"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default="benchmarks/fixtures")
+    parser.add_argument("--model", default=os.getenv("WHISPER_MODEL", "small"))
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0, help="WHISPER_THREADS for both runs (0 = torch default)")
+    parser.add_argument("--output", help="Write both result sets to this JSON file")
+    args = parser.parse_args()
+
+    # The child processes read the Whisper settings from the environment at import
+    os.environ["WHISPER_MODEL"] = args.model
+    os.environ["WHISPER_THREADS"] = str(args.threads)
+    results = {}
+    for mode, value in MODES.items():
+        os.environ["WHISPER_QUANTIZE"] = value
+        results[mode] = run_isolated("whisper", args)
+
+    print(f"model={args.model} threads={args.threads or 'default'}")
+    print(f"{'':16}" + "".join(f"{mode:>12}" for mode in MODES))
+    for column in COLUMNS:
+        print(f"{column:16}" + "".join(f"{str(results[mode][column]):>12}" for mode in MODES))
+    if results["int8"]["latency_p50_ms"]:
+        print(f"p50 speedup: {results['float32']['latency_p50_ms'] / results['int8']['latency_p50_ms']:.2f}x")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import time
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    Thread-safe in-memory cache with a size bound and an optional TTL
+
+    The least recently used entry is dropped once max_entries is reached and
+    entries older than ttl seconds are treated as missing (ttl <= 0 disables
+    expiry). get() returns None on a miss, so None itself is never cached.
+    """
+
+    def __init__(self, max_entries=1024, ttl=0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl > 0 and time.monotonic() - entry[1] > self.ttl:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        if value is None or self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (value, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
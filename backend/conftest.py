@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# database opens its file on import; keep the tests away from user_registration.db
+os.environ["STT_DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
@@ -1,13 +1,19 @@
-from sqlalchemy import create_engine, Column, String, Integer, Date, Boolean
+from sqlalchemy import create_engine, inspect, text, Column, String, Integer, Date, DateTime, Boolean, Text, LargeBinary, Index, and_, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
-from datetime import date
+from datetime import date, datetime, timedelta
+import base64
+import json
 import uuid
+import os
 
 Base = declarative_base()
 
 class UserRecord(Base):
     __tablename__ = 'user_records'
+    # Serves the record listing: WHERE deleted = 0 ORDER BY date DESC, id DESC
+    __table_args__ = (Index('ix_user_records_deleted_date_id', 'deleted', 'date', 'id'),)
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     candidate_name = Column(String)
@@ -18,24 +24,111 @@ class UserRecord(Base):
     date = Column(Date, default=date.today)
     deleted = Column(Boolean, default=False)
 
+class TranscriptionJob(Base):
+    __tablename__ = 'transcription_jobs'
+    # Serves claim_next_job: WHERE status = 'queued' ORDER BY priority DESC, created_at
+    __table_args__ = (Index('ix_transcription_jobs_status_priority_created', 'status', 'priority', 'created_at'),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    status = Column(String, default='queued')  # queued, running, done, failed
+    priority = Column(Integer, default=0)
+    service = Column(String)
+    field = Column(String)  # None for whole-form extraction
+    language = Column(String)
+    session_id = Column(String)
+    content_type = Column(String)
+    audio = Column(LargeBinary)  # dropped once the job has finished
+    result = Column(Text)
+    error = Column(Text)
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    # Set when a runner claims the job; only that runner may renew or finish it
+    lease_id = Column(String)
+    heartbeat_at = Column(DateTime)  # renewed while the job runs, see requeue_stale_jobs
+
+class DataVersion(Base):
+    __tablename__ = 'data_version'
+    # A single row, bumped in the same transaction as every write to user_records
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+# Database configuration (environment variables)
+#   STT_DATABASE_URL   SQLAlchemy URL (default: user_registration.db in the working directory)
+DATABASE_URL = os.getenv("STT_DATABASE_URL", "sqlite:///user_registration.db")
+
 # SQLite database setup
-engine = create_engine('sqlite:///user_registration.db')
+# Pooled connections are handed to whichever threadpool thread needs one,
+# so they must not be pinned to the thread that opened them
+engine = create_engine(DATABASE_URL, connect_args={'check_same_thread': False})
 Base.metadata.create_all(engine)
+# create_all skips tables that already exist, so add indexes introduced later
+for index in UserRecord.__table__.indexes:
+    index.create(engine, checkfirst=True)
+# ...and columns
+for table in (TranscriptionJob.__table__,):
+    existing = {column['name'] for column in inspect(engine).get_columns(table.name)}
+    with engine.begin() as connection:
+        for column in table.columns:
+            if column.name not in existing:
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"))
+
+# Several API processes may start at once, so the first one creates the row
+with engine.begin() as connection:
+    connection.execute(sqlite_insert(DataVersion.__table__).values(id=1, version=0).on_conflict_do_nothing())
 
 Session = sessionmaker(bind=engine)
 
 def get_session():
     return Session()
 
+# The version lives in the database, so every API process sees the writes
+# made by the others and can tell whether its cached reads are still current
+def data_version():
+    with engine.connect() as connection:
+        return connection.execute(select(DataVersion.version).where(DataVersion.id == 1)).scalar()
+
+def bump_version(session):
+    """Count a write; call inside the writing transaction, before its commit"""
+    session.query(DataVersion).filter(DataVersion.id == 1).update({DataVersion.version: DataVersion.version + 1})
+
+# Rows per transaction for bulk imports
+BULK_BATCH_SIZE = int(os.getenv("STT_BULK_BATCH_SIZE", 1000))
+
+def to_years(value):
+    return int(value) if value else 0
+
+BOOLEAN_STRINGS = {"true": True, "1": True, "yes": True, "false": False, "0": False, "no": False, "": False}
+
+def to_bool(value):
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in BOOLEAN_STRINGS:
+        return BOOLEAN_STRINGS[value.strip().lower()]
+    raise ValueError(value)
+
+def to_date(value):
+    if value is None or value == "":
+        return date.today()
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    raise ValueError(value)
+
 def create_record(data):
     session = get_session()
     try:
         # Convert years_of_experience to integer
         if 'years_of_experience' in data:
-            data['years_of_experience'] = int(data['years_of_experience']) if data['years_of_experience'] else 0
+            data['years_of_experience'] = to_years(data['years_of_experience'])
         
         record = UserRecord(**data)
         session.add(record)
+        bump_version(session)
         session.commit()
         return record.id
     except Exception as e:
@@ -44,24 +137,111 @@ def create_record(data):
     finally:
         session.close()
 
-def get_all_records():
+RECORD_FIELDS = ['id', 'candidate_name', 'years_of_experience', 'current_designation',
+                 'address', 'email', 'date', 'deleted']
+
+def encode_cursor(record_date, record_id):
+    raw = json.dumps([record_date.isoformat() if record_date else None, record_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        record_date, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (date.fromisoformat(record_date) if record_date else None), record_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def get_records_page(limit=50, cursor=None, fields=None):
+    """
+    One page of non-deleted records, newest first, using keyset pagination
+
+    Args:
+        limit: Page size
+        cursor: next_cursor returned with the previous page
+        fields: Columns to return (default all); 'id' is always included
+
+    Returns:
+        dict: {"items": [...], "next_cursor": str or None}
+    """
+    fields = list(fields or RECORD_FIELDS)
+    unknown = set(fields) - set(RECORD_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+
+    # Load only the requested columns plus the sort key, not whole ORM objects
+    columns = [getattr(UserRecord, name) for name in dict.fromkeys(fields + ['date'])]
     session = get_session()
     try:
-        return [{
-            'id': r.id,
-            'candidate_name': r.candidate_name,
-            'years_of_experience': r.years_of_experience,
-            'current_designation': r.current_designation,
-            'address': r.address,
-            'email': r.email,
-            'date': r.date.isoformat(),
-            'deleted': r.deleted
-        } for r in session.query(UserRecord)
-          .filter_by(deleted=False)
-          .order_by(UserRecord.date.desc()).all()]
+        query = (session.query(*columns)
+                 .filter_by(deleted=False)
+                 .order_by(UserRecord.date.desc(), UserRecord.id.desc()))
+        if cursor:
+            after_date, after_id = decode_cursor(cursor)
+            query = query.filter(or_(
+                UserRecord.date < after_date,
+                and_(UserRecord.date == after_date, UserRecord.id < after_id),
+            ))
+        rows = query.limit(limit + 1).all()
     finally:
         session.close()
 
+    next_cursor = encode_cursor(rows[limit - 1].date, rows[limit - 1].id) if len(rows) > limit else None
+    items = []
+    for row in rows[:limit]:
+        item = {name: getattr(row, name) for name in fields}
+        if 'date' in item and item['date'] is not None:
+            item['date'] = item['date'].isoformat()
+        items.append(item)
+    return {"items": items, "next_cursor": next_cursor}
+
+def iter_records(start_date=None, end_date=None, include_deleted=False, batch_size=1000):
+    """
+    Yield every matching record as a dict, oldest first, reading batch_size
+    rows at a time from the database so memory use stays constant
+
+    Each batch is a separate keyset query that is read in full before its
+    rows are yielded. An open cursor would hold SQLite's read lock for as
+    long as the client takes to download the export and block every write.
+    """
+    columns = [getattr(UserRecord, name) for name in RECORD_FIELDS]
+    last = None
+    while True:
+        session = get_session()
+        try:
+            query = session.query(*columns)
+            if not include_deleted:
+                query = query.filter_by(deleted=False)
+            if start_date:
+                query = query.filter(UserRecord.date >= start_date)
+            if end_date:
+                query = query.filter(UserRecord.date <= end_date)
+            if last is not None:
+                last_date, last_id = last
+                if last_date is None:
+                    # SQLite sorts rows without a date first
+                    query = query.filter(or_(
+                        UserRecord.date.isnot(None),
+                        and_(UserRecord.date.is_(None), UserRecord.id > last_id),
+                    ))
+                else:
+                    query = query.filter(or_(
+                        UserRecord.date > last_date,
+                        and_(UserRecord.date == last_date, UserRecord.id > last_id),
+                    ))
+            rows = query.order_by(UserRecord.date, UserRecord.id).limit(batch_size).all()
+        finally:
+            session.close()
+
+        for row in rows:
+            record = dict(zip(RECORD_FIELDS, row))
+            if record['date'] is not None:
+                record['date'] = record['date'].isoformat()
+            yield record
+        if len(rows) < batch_size:
+            return
+        last = (rows[-1].date, rows[-1].id)
 
 def get_record_by_id(record_id):
     session = get_session()
@@ -90,9 +270,10 @@ def update_record(record_id, data):
             
         for key, value in data.items():
             if key == 'years_of_experience':
-                value = int(value) if value else 0
+                value = to_years(value)
             setattr(record, key, value)
             
+        bump_version(session)
         session.commit()
         return True
     except Exception as e:
@@ -101,3 +282,218 @@ def update_record(record_id, data):
     finally:
         session.close()
 
+def prepare_bulk_row(data):
+    """Validate and coerce one imported record into a complete row for a bulk insert"""
+    if not isinstance(data, dict):
+        raise ValueError("Record must be a JSON object")
+    unknown = set(data) - set(RECORD_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    # Every row carries every column so the batch is a single executemany
+    row = {name: data.get(name) for name in RECORD_FIELDS}
+    row['id'] = str(row['id'] or uuid.uuid4())
+    try:
+        row['years_of_experience'] = to_years(row['years_of_experience'])
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid years_of_experience: {data['years_of_experience']!r}")
+    try:
+        row['date'] = to_date(row['date'])
+    except ValueError:
+        raise ValueError(f"Invalid date: {data['date']!r}")
+    try:
+        row['deleted'] = to_bool(row['deleted'])
+    except ValueError:
+        raise ValueError(f"Invalid deleted: {data['deleted']!r}")
+    return row
+
+def bulk_create_records(records, batch_size=BULK_BATCH_SIZE):
+    """
+    Insert many records with one transaction per batch
+
+    Invalid records are skipped and reported. If a batch fails in the
+    database it is retried row by row so only the offending rows are lost.
+
+    Returns:
+        dict: {"created": int, "ids": [...], "errors": [{"index", "error"}]}
+    """
+    ids = []
+    errors = []
+    rows = []
+    for index, data in enumerate(records):
+        try:
+            rows.append((index, prepare_bulk_row(data)))
+        except ValueError as e:
+            errors.append({"index": index, "error": str(e)})
+
+    insert = UserRecord.__table__.insert()
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        session = get_session()
+        try:
+            session.execute(insert, [row for _, row in batch])
+            bump_version(session)
+            session.commit()
+            ids.extend(row['id'] for _, row in batch)
+        except Exception:
+            session.rollback()
+            for index, row in batch:
+                try:
+                    session.execute(insert, [row])
+                    bump_version(session)
+                    session.commit()
+                    ids.append(row['id'])
+                except Exception as e:
+                    session.rollback()
+                    errors.append({"index": index, "error": str(e.__cause__ or e)})
+        finally:
+            session.close()
+
+    errors.sort(key=lambda error: error["index"])
+    return {"created": len(ids), "ids": ids, "errors": errors}
+
+JOB_FIELDS = ['id', 'status', 'priority', 'service', 'field', 'language', 'session_id',
+              'result', 'error', 'attempts', 'created_at', 'started_at', 'finished_at']
+
+def job_to_dict(job):
+    data = {name: getattr(job, name) for name in JOB_FIELDS}
+    data['result'] = json.loads(job.result) if job.result else None
+    for name in ('created_at', 'started_at', 'finished_at'):
+        data[name] = data[name].isoformat() if data[name] else None
+    return data
+
+def create_job(data):
+    session = get_session()
+    try:
+        job = TranscriptionJob(**data)
+        session.add(job)
+        session.commit()
+        return job.id
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+def get_job(job_id):
+    session = get_session()
+    try:
+        job = session.query(TranscriptionJob).filter_by(id=job_id).first()
+        return job_to_dict(job) if job else None
+    finally:
+        session.close()
+
+def claim_next_job():
+    """
+    Mark the highest-priority, oldest queued job as running and return it
+    with its audio and lease_id, or None when the queue is empty
+
+    The conditional UPDATE makes the claim safe when several API processes
+    take jobs from the same database.
+    """
+    session = get_session()
+    try:
+        while True:
+            candidate = (session.query(TranscriptionJob.id)
+                         .filter_by(status='queued')
+                         .order_by(TranscriptionJob.priority.desc(), TranscriptionJob.created_at)
+                         .first())
+            if candidate is None:
+                return None
+            now = datetime.utcnow()
+            lease_id = str(uuid.uuid4())
+            claimed = (session.query(TranscriptionJob)
+                       .filter_by(id=candidate.id, status='queued')
+                       .update({'status': 'running', 'started_at': now, 'heartbeat_at': now, 'lease_id': lease_id,
+                                'attempts': TranscriptionJob.attempts + 1}))
+            session.commit()
+            if claimed:
+                job = session.query(TranscriptionJob).filter_by(id=candidate.id).first()
+                return {**job_to_dict(job), 'audio': job.audio, 'content_type': job.content_type, 'lease_id': lease_id}
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+def leased(session, job_id, lease_id):
+    return session.query(TranscriptionJob).filter_by(id=job_id, status='running', lease_id=lease_id)
+
+def heartbeat_job(job_id, lease_id):
+    """
+    Renew the lease of a running job
+
+    Returns:
+        bool: False when the lease was lost (the job was taken back as stale)
+    """
+    session = get_session()
+    try:
+        renewed = leased(session, job_id, lease_id).update({'heartbeat_at': datetime.utcnow()})
+        session.commit()
+        return bool(renewed)
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+def finish_job(job_id, lease_id, result=None, error=None):
+    """Store the outcome of a job, unless its lease was lost to another run"""
+    session = get_session()
+    try:
+        finished = leased(session, job_id, lease_id).update({
+            'status': 'failed' if error else 'done',
+            'result': json.dumps(result) if result is not None else None,
+            'error': error,
+            'audio': None,
+            'finished_at': datetime.utcnow(),
+        })
+        session.commit()
+        return bool(finished)
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+def requeue_job(job_id, lease_id):
+    """Put a claimed job back in the queue without counting the attempt"""
+    session = get_session()
+    try:
+        leased(session, job_id, lease_id).update({
+            'status': 'queued', 'started_at': None, 'heartbeat_at': None, 'lease_id': None,
+            'attempts': TranscriptionJob.attempts - 1})
+        session.commit()
+    finally:
+        session.close()
+
+def requeue_stale_jobs(older_than, max_attempts):
+    """
+    Return jobs left running by a process that died to the queue, or fail
+    them once they have used max_attempts. A job is stale when its runner
+    has not renewed the heartbeat for older_than seconds.
+
+    Returns:
+        int: Number of jobs requeued or failed
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=older_than)
+    session = get_session()
+    try:
+        stale = (session.query(TranscriptionJob)
+                 .filter(TranscriptionJob.status == 'running',
+                         or_(TranscriptionJob.heartbeat_at <= cutoff, TranscriptionJob.heartbeat_at.is_(None)))
+                 .all())
+        for job in stale:
+            # Dropping the lease stops the interrupted run from finishing the job later
+            job.lease_id, job.heartbeat_at = None, None
+            if job.attempts >= max_attempts:
+                job.status, job.error, job.audio, job.finished_at = 'failed', 'Gave up after repeated interruptions', None, datetime.utcnow()
+            else:
+                job.status, job.started_at = 'queued', None
+        session.commit()
+        return len(stale)
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
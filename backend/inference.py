@@ -0,0 +1,59 @@
+import logging
+from services import get_engine
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+def infer(service, samples, language, session_id=None, timeout=5, timings=None):
+    """
+    Transcribe samples with one engine, or capture from the microphone when samples is None
+
+    Runs wherever the models live: in the API's worker pool, or inside a
+    model server worker (see model_server).
+
+    Returns:
+        dict: transcript, language, language_confidence (Whisper only),
+              word_confidence (Vosk only) and the seconds spent in each stage
+              under "timings"
+    """
+    timings = {} if timings is None else timings
+    # The microphone capture and the inference happen in one service call
+    stage = "inference" if samples is not None else "listen"
+
+    confidence = None
+    if service == "google":
+        google_service = get_engine("google")
+        logger.info("Transcribing with Google")
+        with timed(timings, stage):
+            if samples is not None:
+                transcript = google_service.transcribe_audio(samples)
+            else:
+                transcript = google_service.listen_and_transcribe(timeout=timeout)
+        detected_lang = language
+    elif service == "whisper":
+       whisper_service = get_engine("whisper")
+       logger.info(f"Transcribing with Whisper (Language: {language})")
+       with timed(timings, "model_load"):
+           whisper_service.load_model()
+       with timed(timings, stage):
+           if samples is not None:
+               transcript, detected_lang, confidence = whisper_service.transcribe_audio(samples, language=language, session_id=session_id)
+           else:
+               transcript, detected_lang, confidence = whisper_service.listen_and_transcribe(timeout=timeout, language=language, session_id=session_id)
+    elif service == "vosk":
+        vosk_service = get_engine("vosk")
+        logger.info(f"Transcribing with Vosk (Language: {language})")
+        vosk_language = (language or 'en') if samples is not None else language
+        with timed(timings, "model_load"):
+            vosk_service.load_model(vosk_language)
+        with timed(timings, stage):
+            if samples is not None:
+                transcript, detected_lang, word_confidence = vosk_service.transcribe_audio(samples, language=vosk_language)
+            else:
+                transcript, detected_lang, word_confidence = vosk_service.listen_and_transcribe(timeout=timeout, language=language)
+    else:
+        raise Exception(f"Unknown engine: {service}")
+    result = {"transcript": transcript, "language": detected_lang, "language_confidence": confidence, "timings": timings}
+    if service == "vosk":
+        result["word_confidence"] = word_confidence
+    return result
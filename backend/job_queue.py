@@ -0,0 +1,151 @@
+import os
+import asyncio
+import logging
+from starlette.concurrency import run_in_threadpool
+from database import claim_next_job, heartbeat_job, finish_job, requeue_job, requeue_stale_jobs, get_job
+
+logger = logging.getLogger(__name__)
+
+# Job queue configuration (environment variables)
+#   STT_JOB_WORKERS         jobs processed at the same time by each API process
+#   STT_JOB_POLL_SECONDS    how often idle runners look for jobs queued by other processes
+#   STT_JOB_TIMEOUT         seconds a job may spend waiting for and running in the worker pool
+#                           (jobs do not use the synchronous STT_REQUEST_TIMEOUT)
+#   STT_JOB_HEARTBEAT_SECONDS  how often a running job renews its lease
+#   STT_JOB_STALE_SECONDS   a running job whose lease was not renewed for this long was
+#                           interrupted (server restart) and is requeued
+#   STT_JOB_MAX_ATTEMPTS    interrupted runs before a job is marked failed
+JOB_WORKERS = int(os.getenv("STT_JOB_WORKERS", 2))
+POLL_SECONDS = float(os.getenv("STT_JOB_POLL_SECONDS", 1))
+JOB_TIMEOUT = float(os.getenv("STT_JOB_TIMEOUT", 900))
+HEARTBEAT_SECONDS = float(os.getenv("STT_JOB_HEARTBEAT_SECONDS", 15))
+STALE_SECONDS = float(os.getenv("STT_JOB_STALE_SECONDS", 120))
+MAX_ATTEMPTS = int(os.getenv("STT_JOB_MAX_ATTEMPTS", 3))
+
+FINAL_STATUSES = ("done", "failed")
+
+class RetryLater(Exception):
+    """Raised by the job processor when the job should go back in the queue"""
+
+    def __init__(self, delay):
+        super().__init__(f"Retry in {delay}s")
+        self.delay = delay
+
+class JobRunner:
+    """
+    Runs queued transcription jobs in the background
+
+    Jobs live in the database, so they survive restarts and can be taken by
+    any API process. Each process runs `workers` loops that claim the next
+    job by priority and pass it to process(job), an async callable returning
+    the result dict. Waiters in wait() are woken as soon as a job finishes.
+    """
+
+    def __init__(self, process, workers=JOB_WORKERS):
+        self.process = process
+        self.workers = workers
+        self.tasks = []
+        self.wakeup = None
+        self.finished = {}  # job id -> asyncio.Event, for long-polling clients
+
+    def start(self):
+        self.wakeup = asyncio.Event()
+        self.tasks = [asyncio.create_task(self.run()) for _ in range(self.workers)]
+        self.tasks.append(asyncio.create_task(self.sweep()))
+        logger.info(f"Job runner started with {self.workers} workers")
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    def notify(self):
+        """A job was submitted, wake an idle worker"""
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    async def run(self):
+        while True:
+            # Cleared before looking, so a job submitted meanwhile is not missed
+            self.wakeup.clear()
+            try:
+                job = await run_in_threadpool(claim_next_job)
+            except Exception as e:
+                logger.error(f"Could not claim a job: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.execute(job)
+
+    async def heartbeat(self, job):
+        """Renew the job's lease while it runs, so the sweep leaves it alone"""
+        while True:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            try:
+                if not await run_in_threadpool(heartbeat_job, job["id"], job["lease_id"]):
+                    logger.warning(f"Job {job['id']} lost its lease, its result will be discarded")
+                    return
+            except Exception as e:
+                logger.error(f"Could not renew job {job['id']}: {e}")
+
+    async def execute(self, job):
+        logger.info(f"Running job {job['id']} ({job['service']}, priority {job['priority']})")
+        heartbeat = asyncio.create_task(self.heartbeat(job))
+        try:
+            result = await self.process(job)
+            await run_in_threadpool(finish_job, job["id"], job["lease_id"], result)
+        except RetryLater as e:
+            heartbeat.cancel()
+            logger.info(f"Requeueing job {job['id']}: {e}")
+            await run_in_threadpool(requeue_job, job["id"], job["lease_id"])
+            await asyncio.sleep(e.delay)
+            return
+        except asyncio.CancelledError:
+            # Shutting down: leave the job to be requeued as stale
+            raise
+        except Exception as e:
+            logger.error(f"Job {job['id']} failed: {e}")
+            await run_in_threadpool(finish_job, job["id"], job["lease_id"], None, str(e) or type(e).__name__)
+        finally:
+            heartbeat.cancel()
+        event = self.finished.pop(job["id"], None)
+        if event is not None:
+            event.set()
+
+    async def sweep(self):
+        while True:
+            try:
+                count = await run_in_threadpool(requeue_stale_jobs, STALE_SECONDS, MAX_ATTEMPTS)
+                if count:
+                    logger.warning(f"Recovered {count} interrupted jobs")
+                    self.notify()
+            except Exception as e:
+                logger.error(f"Stale job sweep failed: {e}")
+            await asyncio.sleep(max(STALE_SECONDS / 4, 1))
+
+    async def wait(self, job_id, timeout):
+        """
+        Return the job once it has finished or timeout seconds have passed
+
+        The database is re-read every poll interval too, for jobs run by
+        another API process.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            job = await run_in_threadpool(get_job, job_id)
+            remaining = deadline - loop.time()
+            if job is None or job["status"] in FINAL_STATUSES:
+                self.finished.pop(job_id, None)
+                return job
+            if remaining <= 0:
+                return job
+            event = self.finished.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), min(remaining, POLL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
@@ -1,15 +1,54 @@
-from fastapi import FastAPI, Query, HTTPException, Request
+from fastapi import FastAPI, Query, HTTPException, Request, Response, UploadFile, File, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from services import google_service, whisper_service, vosk_service
-from database import create_record, get_all_records, update_record, get_record_by_id
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from services import get_engine, ENABLED_ENGINES
+from services.engine_config import whisper_model_id, VOSK_MODEL_PATHS, vosk_model_language
+from services.audio_utils import decode_audio, AudioFormatError, SAMPLE_RATE
+from services.model_registry import registry
+from services.vad import trim_silence
+from services.field_extraction import extract_single_field, extract_all_fields, match_field, FORM_FIELDS
+from services.transcription_cache import transcription_cache, cache_key
+from worker_pool import get_pool, PoolSaturated
+from inference import infer
+from model_server import get_client, MODEL_SERVER_ENGINES
+from cache import LRUCache
+from metrics import timed, observe_stages, RuntimeMetrics, process_exited, render, REQUEST_SECONDS, DB_SECONDS, ERRORS, EMPTY_TRANSCRIPTS, ESCALATIONS
+from job_queue import JobRunner, RetryLater, JOB_TIMEOUT
+from database import create_record, bulk_create_records, get_records_page, iter_records, update_record, get_record_by_id, data_version, RECORD_FIELDS, create_job
 import re
+import io
+import csv
+import json
+import asyncio
+import hashlib
+import time
 import logging
 import os
 from typing import Optional
+from datetime import date
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Longest microphone capture for /transcribe-form, in seconds
+FORM_TIMEOUT = int(os.getenv("STT_FORM_TIMEOUT", 20))
+# service=auto passes the audio on to Whisper when Vosk's mean word confidence is below this
+AUTO_MIN_CONFIDENCE = float(os.getenv("STT_AUTO_MIN_CONFIDENCE", 0.8))
+# Largest page /records will serve
+MAX_PAGE_SIZE = int(os.getenv("STT_MAX_PAGE_SIZE", 500))
+# Read cache for /records and /record/{id}: entries kept, and seconds before
+# an entry is re-read even though the data version is unchanged (0 = never)
+READ_CACHE_SIZE = int(os.getenv("STT_READ_CACHE_SIZE", 256))
+READ_CACHE_TTL = float(os.getenv("STT_READ_CACHE_TTL", 300))
+
+read_cache = LRUCache(READ_CACHE_SIZE, READ_CACHE_TTL)
+
+# Values of the service parameter: the enabled engines (STT_ENGINES), and
+# auto when both of the engines it cascades between are enabled
+SERVICES = ENABLED_ENGINES + (["auto"] if {"vosk", "whisper"} <= set(ENABLED_ENGINES) else [])
+SERVICE_PATTERN = f"^({'|'.join(SERVICES)})$"
+
 app = FastAPI()
 
 # Allow CORS for frontend
@@ -20,58 +59,426 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def run_engine(service, language, data=None, content_type=None, session_id=None, timeout=5, request_timeout=None):
+    """
+    Capture or decode audio and transcribe it with one engine. Runs in the worker
+    pool; with STT_MODEL_SERVER set, Whisper and Vosk run in the model server,
+    which must answer within request_timeout (default STT_REQUEST_TIMEOUT).
+
+    Returns:
+        dict: transcript, language, language_confidence (Whisper only) and the
+              seconds spent in each stage under "timings"
+    """
+    timings = {}
+    if data is not None:
+        with timed(timings, "decode"):
+            samples = decode_audio(data, content_type)
+        logger.info(f"Received {samples.size / SAMPLE_RATE:.2f}s of uploaded audio")
+        with timed(timings, "trim"):
+            samples = trim_silence(samples, SAMPLE_RATE)
+    else:
+        samples = None
+    client = get_client()
+    if client is not None and service in MODEL_SERVER_ENGINES:
+        return client.infer(service, samples, language, session_id, timeout, timings, request_timeout)
+    return infer(service, samples, language, session_id, timeout, timings)
+
+def engine_model(service, language):
+    """
+    The model an engine would use for this request, part of the transcription
+    cache key. Read from the configuration so the API never imports the engine.
+    """
+    if service == "whisper":
+        return whisper_model_id()
+    if service == "vosk":
+        return VOSK_MODEL_PATHS[vosk_model_language(language or 'en')]
+    return service
+
+async def submit_to_pool(service, fn, *args, pool_timeout=None):
+    try:
+        return await get_pool().submit(service, fn, *args, timeout=pool_timeout)
+    except PoolSaturated as e:
+        logger.warning(f"Rejecting {service} request: {e}")
+        ERRORS.labels(service, "saturated").inc()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except (asyncio.TimeoutError, TimeoutError):
+        # TimeoutError: the model server did not answer in time
+        logger.error(f"Timed out transcribing with {service}")
+        ERRORS.labels(service, "timeout").inc()
+        raise HTTPException(status_code=504, detail="Transcription timed out")
+    except AudioFormatError as e:
+        ERRORS.labels(service, "bad_audio").inc()
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def transcribe_with_cache(service, language, data=None, content_type=None, session_id=None, timeout=5, pool_timeout=None):
+    """
+    Run run_engine in the worker pool, unless the same upload was already
+    transcribed by the same engine, model and language. Hits skip the pool.
+    Empty transcripts are not stored since Google returns one on API errors.
+    timeout is the longest microphone capture; pool_timeout overrides
+    STT_REQUEST_TIMEOUT for the pool call.
+    """
+    if data is not None:
+        key = cache_key(data, service, engine_model(service, language), language)
+    else:
+        key = None
+    if key:
+        cached = await run_in_threadpool(transcription_cache.get, key)
+        if cached is not None:
+            logger.info(f"Transcription cache hit ({service})")
+            return {**cached, "cached": True}
+
+    start = time.perf_counter()
+    result = await submit_to_pool(service, run_engine, service, language, data, content_type, session_id, timeout,
+                                  pool_timeout, pool_timeout=pool_timeout)
+    timings = result.pop("timings")
+    # Whatever the worker did not account for was spent waiting for it
+    timings["queue"] = max(time.perf_counter() - start - sum(timings.values()), 0.0)
+    observe_stages(service, timings)
+    if not result["transcript"]:
+        EMPTY_TRANSCRIPTS.labels(service).inc()
+    if key and result["transcript"]:
+        await run_in_threadpool(transcription_cache.put, key, result)
+    return {**result, "cached": False}
+
+def extract_fields(service, field, result):
+    """The field's value, or every form field when field is None"""
+    timings = {}
+    with timed(timings, "extraction"):
+        if field:
+            extracted = {"value": extract_single_field(result["transcript"], field, result["language"])}
+        else:
+            extracted = {"fields": extract_all_fields(result["transcript"], result["language"])}
+    observe_stages(service, timings)
+    return extracted
+
+def escalation_reason(field, result, extracted):
+    """Why a Vosk result is not good enough for service=auto, or None if it is"""
+    if not result["transcript"]:
+        return "empty"
+    if result.get("word_confidence") is None or result["word_confidence"] < AUTO_MIN_CONFIDENCE:
+        return "low_confidence"
+    # Fields without a parser always get the whole transcript, so only known ones can fail
+    if field in FORM_FIELDS and match_field(result["transcript"], field, result["language"]) is None:
+        return "extraction_failed"
+    if not field and any(value["confidence"] == 0 for value in extracted["fields"].values()):
+        return "extraction_failed"
+    return None
+
+async def transcribe_and_extract(service, field, language, data=None, content_type=None, session_id=None, timeout=5, pool_timeout=None):
+    """
+    Transcribe with one engine and extract the field (the whole form when
+    field is None). service="auto" runs Vosk first and passes the same audio
+    to Whisper only when Vosk is unsure or the field cannot be extracted.
+    """
+    if service != "auto":
+        result = await transcribe_with_cache(service, language, data, content_type, session_id, timeout, pool_timeout)
+        return {**extract_fields(service, field, result), **result, "engine": service}
+
+    if data is None:
+        # A microphone capture cannot be replayed to the second engine
+        raise HTTPException(status_code=400, detail="service=auto needs an uploaded recording")
+    result = await transcribe_with_cache("vosk", language, data, content_type, session_id, timeout, pool_timeout)
+    extracted = extract_fields("vosk", field, result)
+    reason = escalation_reason(field, result, extracted)
+    if reason is None:
+        return {**extracted, **result, "engine": "vosk", "escalated": None}
+
+    logger.info(f"Escalating to Whisper: {reason} (Vosk word confidence {result.get('word_confidence')})")
+    ESCALATIONS.labels(reason).inc()
+    result = await transcribe_with_cache("whisper", language, data, content_type, session_id, timeout, pool_timeout)
+    return {**extract_fields("whisper", field, result), **result, "engine": "whisper", "escalated": reason}
+
 @app.post("/transcribe-field")
 async def transcribe_field(
-    service: str = Query(..., regex="^(google|whisper|vosk)$"),
+    service: str = Query(..., regex=SERVICE_PATTERN, description="Engine; auto tries Vosk first and falls back to Whisper"),
     field: str = Query(..., description="Field to transcribe"),
-    language: Optional[str] = Query(None, description="Language code like 'en', 'hi', 'mr'")
+    language: Optional[str] = Query(None, description="Language code like 'en', 'hi', 'mr'"),
+    audio: Optional[UploadFile] = File(None, description="Recorded audio (WAV/PCM or webm/opus). If omitted, the server microphone is used"),
+    session_id: Optional[str] = Query(None, description="Form session; Whisper reuses the language detected for its first field")
 ):
     try:
-        if service == "google":
-            logger.info(f"Transcribing {field} with Google")
-            transcript = google_service.listen_and_transcribe()
-            extracted = google_service.extract_single_field(transcript, field)
-            return {"value": extracted, "transcript": transcript}
-        elif service == "whisper":
-           logger.info(f"Transcribing {field} with Whisper (Language: {language})")
-           transcript, detected_lang = whisper_service.listen_and_transcribe(language=language)
-           extracted = whisper_service.extract_single_field(transcript, field, detected_lang)
-           return {"value": extracted, "transcript": transcript}
-        elif service == "vosk":
-            logger.info(f"Transcribing {field} with Vosk (Language: {language})")
-            transcript, detected_lang = vosk_service.listen_and_transcribe(language=language)
-            extracted = vosk_service.extract_single_field(transcript, field, detected_lang)
-            return {"value": extracted, "transcript": transcript}
+        data = await audio.read() if audio is not None else None
+        content_type = audio.content_type if audio is not None else None
+        logger.info(f"Transcribing {field} with {service}")
+        with REQUEST_SECONDS.labels("transcribe-field", service).time():
+            return await transcribe_and_extract(service, field, language, data, content_type, session_id)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error: {str(e)}")
+        ERRORS.labels(service, "error").inc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/transcribe-form")
+async def transcribe_form(
+    service: str = Query(..., regex=SERVICE_PATTERN, description="Engine; auto tries Vosk first and falls back to Whisper"),
+    language: Optional[str] = Query(None, description="Language code like 'en', 'hi', 'mr'"),
+    audio: Optional[UploadFile] = File(None, description="One recording covering all fields. If omitted, the server microphone is used"),
+    session_id: Optional[str] = Query(None, description="Form session; Whisper reuses the language detected for its first field")
+):
+    """
+    Fill the whole form from one utterance ("my name is ..., I have 5 years of
+    experience, I work as ..., my email is ...") with a single inference.
+    Returns {"fields": {field: {"value", "confidence"}}, "transcript", ...}.
+    """
+    try:
+        data = await audio.read() if audio is not None else None
+        content_type = audio.content_type if audio is not None else None
+        logger.info(f"Transcribing whole form with {service}")
+        with REQUEST_SECONDS.labels("transcribe-form", service).time():
+            return await transcribe_and_extract(service, None, language, data, content_type, session_id, FORM_TIMEOUT)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        ERRORS.labels(service, "error").inc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.websocket("/ws/transcribe")
+async def transcribe_stream(
+    websocket: WebSocket,
+    field: str = Query(..., description="Field to transcribe"),
+    language: str = Query('en', description="Language code, 'en' or 'hi'"),
+    sample_rate: int = Query(16000, description="Sample rate of the PCM chunks")
+):
+    """
+    Stream 16-bit mono PCM chunks (binary frames) and receive Vosk results as they arrive.
+
+    The server sends {"type": "partial"} while an utterance is in progress and
+    {"type": "result"} each time one completes. Send the text frame "end" to
+    finish; the server answers {"type": "final", "value", "transcript"} and closes.
+    """
+    await websocket.accept()
+    try:
+        vosk_service = await run_in_threadpool(get_engine, "vosk")
+        recognizer = await run_in_threadpool(vosk_service.start_stream, language, sample_rate)
+        segments = []
+        last_partial = ""
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                event = await run_in_threadpool(vosk_service.accept_chunk, recognizer, message["bytes"])
+                if event["type"] == "result":
+                    segments.append(event["text"])
+                    last_partial = ""
+                elif event["text"] == last_partial:
+                    continue
+                else:
+                    last_partial = event["text"]
+                await websocket.send_json(event)
+            elif message.get("text") == "end":
+                break
+
+        segments.append(await run_in_threadpool(vosk_service.finish_stream, recognizer))
+        transcript = " ".join(segment for segment in segments if segment)
+        logger.info(f"📝 Vosk streaming recognition: {transcript}")
+        extracted = extract_single_field(transcript, field, language)
+        await websocket.send_json({"type": "final", "value": extracted, "transcript": transcript})
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"Streaming client for {field} disconnected")
+    except Exception as e:
+        logger.error(f"Streaming error: {str(e)}")
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1011)
+
+async def process_job(job):
+    """Transcribe a queued job's audio the same way the synchronous endpoints do"""
+    try:
+        return await transcribe_and_extract(job["service"], job["field"], job["language"], job["audio"], job["content_type"],
+                                            job["session_id"], pool_timeout=JOB_TIMEOUT)
+    except HTTPException as e:
+        if e.status_code == 503:
+            raise RetryLater(int((e.headers or {}).get("Retry-After", 1)))
+        raise Exception(e.detail)
+
+job_runner = JobRunner(process_job)
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    service: str = Query(..., regex=SERVICE_PATTERN, description="Engine; auto tries Vosk first and falls back to Whisper"),
+    field: Optional[str] = Query(None, description="Field to extract; omit to extract the whole form"),
+    language: Optional[str] = Query(None, description="Language code like 'en', 'hi', 'mr'"),
+    priority: int = Query(0, description="Higher runs first"),
+    audio: UploadFile = File(..., description="Recorded audio (WAV/PCM or webm/opus)"),
+    session_id: Optional[str] = Query(None, description="Form session; Whisper reuses the language detected for its first field")
+):
+    """
+    Queue a transcription and return its id at once. The job is stored in the
+    database, so it survives restarts; fetch the result from GET /jobs/{id}.
+    """
+    data = await audio.read()
+    if not data:
+        raise HTTPException(status_code=400, detail="Empty audio upload")
+    try:
+        job_id = await run_in_threadpool(create_job, {
+            "service": service, "field": field, "language": language, "priority": priority,
+            "session_id": session_id, "content_type": audio.content_type, "audio": data,
+        })
+    except Exception as e:
+        logger.error(f"Error queueing job: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    job_runner.notify()
+    return {"id": job_id, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+async def get_transcription_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=60, description="Seconds to wait for the job to finish (long-poll)")
+):
+    """Job status, with the same result as /transcribe-field (or /transcribe-form) once done"""
+    job = await job_runner.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 @app.post("/create-record")
 async def create_user_record(request: Request):
     data = await request.json()
     try:
-        record_id = create_record(data)
+        with DB_SECONDS.labels("create").time():
+            record_id = create_record(data)
         return {"id": record_id, "message": "Record created successfully"}
     except Exception as e:
         logger.error(f"Error creating record: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/records/bulk")
+async def bulk_create_user_records(request: Request):
+    """
+    Import many records at once. The body is a JSON array of records, or
+    NDJSON (one record per line) with Content-Type application/x-ndjson.
+    Invalid records are reported by their position and the rest are imported.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    parse_errors = {}
+    try:
+        if "ndjson" in content_type or "jsonl" in content_type:
+            records = []
+            for line in body.decode().splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    # Keep the line's position so later errors still line up
+                    parse_errors[len(records)] = f"Invalid JSON: {e}"
+                    records.append(None)
+        else:
+            records = json.loads(body)
+            if not isinstance(records, list):
+                raise HTTPException(status_code=400, detail="Expected a JSON array of records")
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid request body: {e}")
+
+    try:
+        with DB_SECONDS.labels("bulk_create").time():
+            result = await run_in_threadpool(bulk_create_records, records)
+    except Exception as e:
+        logger.error(f"Error importing records: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    for error in result["errors"]:
+        error["error"] = parse_errors.get(error["index"], error["error"])
+    logger.info(f"Bulk import: {result['created']} created, {len(result['errors'])} rejected")
+    return result
+
+def cached_read(request, response, key, load):
+    """
+    Serve a read from the cache, or answer 304 when the client already has it
+
+    Results are cached under the database version, so every write, from
+    any API process, makes the earlier entries stale without explicit
+    invalidation. The ETag is a hash
+    of the result itself, which keeps it valid across versions and cache
+    expiry. Returns None when load() finds nothing; that is not cached.
+
+    Reads the version (and on a miss runs load()) in the database, so call
+    it through run_in_threadpool from async handlers.
+    """
+    cache_key = (data_version(), key)
+    cached = read_cache.get(cache_key)
+    if cached is None:
+        value = load()
+        if value is None:
+            return None
+        body = json.dumps(value, sort_keys=True, default=str)
+        cached = (value, f'W/"{hashlib.sha1(body.encode()).hexdigest()[:20]}"')
+        read_cache.put(cache_key, cached)
+
+    value, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    client_tags = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+    if etag in client_tags or "*" in client_tags:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return value
+
 @app.get("/records")
-async def get_records():
+async def get_records(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE, description="Records per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. 'candidate_name,email'")
+):
     try:
-        records = get_all_records()
-        return records
+        field_list = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+        key = f"records:{limit}:{cursor}:{','.join(field_list or [])}"
+        return await run_in_threadpool(cached_read, request, response, key, lambda: get_records_page(limit, cursor, field_list))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching records: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def export_rows(records, export_format, rows_per_chunk=500):
+    """Serialise records to CSV or NDJSON text, a few hundred rows per chunk"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=RECORD_FIELDS) if export_format == "csv" else None
+    if writer:
+        writer.writeheader()
+    count = 0
+    for record in records:
+        if writer:
+            writer.writerow(record)
+        else:
+            buffer.write(json.dumps(record) + "\n")
+        count += 1
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@app.get("/records/export")
+def export_records(
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    start_date: Optional[date] = Query(None, description="Only records on or after this date"),
+    end_date: Optional[date] = Query(None, description="Only records on or before this date"),
+    include_deleted: bool = Query(False)
+):
+    """Stream matching records as CSV or NDJSON without building them all in memory"""
+    records = iter_records(start_date, end_date, include_deleted)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_rows(records, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=records.{format}"},
+    )
+
 @app.get("/record/{record_id}")
-async def get_record(record_id: str):
+async def get_record(record_id: str, request: Request, response: Response):
     try:
-        record = get_record_by_id(record_id)
+        record = await run_in_threadpool(cached_read, request, response, f"record:{record_id}", lambda: get_record_by_id(record_id))
         if not record:
             raise HTTPException(status_code=404, detail="Record not found")
         return record
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching record: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -80,17 +487,58 @@ async def get_record(record_id: str):
 async def update_user_record(record_id: str, request: Request):
     data = await request.json()
     try:
-        success = update_record(record_id, data)
+        with DB_SECONDS.labels("update").time():
+            success = update_record(record_id, data)
         if success:
             return {"message": "Record updated successfully"}
         raise HTTPException(status_code=404, detail="Record not found")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating record: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/")
 def health_check():
-    return {"status": "running", "message": "Voice registration system is operational"}
+    models = registry.status()
+    return {
+        "status": "running" if models["ready"] else "loading",
+        "message": "Voice registration system is operational",
+        "ready": models["ready"],
+        "models": models["models"],
+        "engines": ENABLED_ENGINES,
+        "max_page_size": MAX_PAGE_SIZE,
+        "workers": get_pool().stats(),
+        "transcription_cache": transcription_cache.stats(),
+    }
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus metrics: per-engine and per-stage latency, errors, queue and model state"""
+    runtime_metrics.refresh()
+    body, content_type = render()
+    return Response(body, headers={"Content-Type": content_type})
+
+runtime_metrics = RuntimeMetrics(get_pool, registry, transcription_cache)
+
+@app.on_event("startup")
+def start_runtime_metrics():
+    runtime_metrics.start()
+
+@app.on_event("startup")
+def start_model_registry():
+    # With a model server the models are loaded there, not in every API worker
+    registry.start([] if get_client() else None)
+
+@app.on_event("startup")
+def start_job_runner():
+    job_runner.start()
+
+@app.on_event("shutdown")
+async def shutdown_pool():
+    await job_runner.stop()
+    get_pool().shutdown()
+    process_exited()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,129 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, generate_latest, multiprocess, CONTENT_TYPE_LATEST
+
+logger = logging.getLogger(__name__)
+
+# Metrics configuration (environment variables)
+#   PROMETHEUS_MULTIPROC_DIR   empty directory shared by the API worker processes; set it
+#                              (and empty it before every start) when running uvicorn
+#                              --workers N, so that /metrics reports all the workers
+#                              together rather than whichever one served the scrape
+#   STT_METRICS_REFRESH_SECONDS  how often each worker publishes its pool, model and cache state
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+REFRESH_SECONDS = float(os.getenv("STT_METRICS_REFRESH_SECONDS", 5))
+
+# Transcription stages, timed where they run (possibly in a worker process)
+# and reported back to the API process with the result:
+#   queue        waiting for a worker slot, including any transfer to a worker process
+#   model_load   fetching the model from the registry (near zero once it is loaded)
+#   decode       decoding the uploaded audio
+#   trim         cutting silence from the upload
+#   inference    running the engine on the upload
+#   listen       capturing from the server microphone and transcribing it
+#   extraction   pulling field values out of the transcript
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+REQUEST_SECONDS = Histogram("stt_request_seconds", "End-to-end transcription request time",
+                            ["endpoint", "engine"], buckets=LATENCY_BUCKETS)
+STAGE_SECONDS = Histogram("stt_stage_seconds", "Time spent in each transcription stage",
+                          ["engine", "stage"], buckets=LATENCY_BUCKETS)
+DB_SECONDS = Histogram("stt_db_seconds", "Database write time", ["operation"], buckets=LATENCY_BUCKETS)
+ERRORS = Counter("stt_errors_total", "Failed transcription requests", ["engine", "reason"])
+EMPTY_TRANSCRIPTS = Counter("stt_empty_transcripts_total", "Transcriptions that produced no text", ["engine"])
+# Runtime state, copied from each worker by RuntimeMetrics. With several
+# workers the pool gauges and model memory are summed over the live ones.
+POOL_WORKERS = Gauge("stt_pool_workers", "Worker slots for engine calls", multiprocess_mode="livesum")
+POOL_IN_FLIGHT = Gauge("stt_pool_in_flight", "Engine calls running", multiprocess_mode="livesum")
+POOL_QUEUED = Gauge("stt_pool_queued", "Requests waiting for a worker", multiprocess_mode="livesum")
+MODEL_MEMORY = Gauge("stt_model_memory_bytes", "Estimated size of each loaded model", ["engine", "variant"],
+                     multiprocess_mode="livesum")
+MODEL_LOAD_SECONDS = Gauge("stt_model_load_seconds", "How long each loaded model took to load", ["engine", "variant"],
+                           multiprocess_mode="livemax")
+CACHE_LOOKUPS = Counter("stt_transcription_cache_lookups", "Transcription cache lookups", ["result"])
+ESCALATIONS = Counter("stt_auto_escalations_total", "service=auto requests passed on from Vosk to Whisper", ["reason"])
+
+@contextmanager
+def timed(timings, stage):
+    """Add the duration of the block to timings[stage]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+def observe_stages(engine, timings):
+    for stage, seconds in timings.items():
+        STAGE_SECONDS.labels(engine, stage).observe(seconds)
+
+class RuntimeMetrics:
+    """
+    Publishes worker pool, model and cache state to the gauges above
+
+    A scrape reaches a single worker, so every worker refreshes its own
+    values in the background and the scraped one again just before answering.
+    """
+
+    def __init__(self, pool, registry, transcription_cache):
+        self.pool = pool
+        self.registry = registry
+        self.transcription_cache = transcription_cache
+        self.lock = threading.Lock()
+        self.models = set()
+        self.cache_counts = {"memory_hit": 0, "disk_hit": 0, "miss": 0}
+        self.thread = None
+
+    def refresh(self):
+        with self.lock:
+            stats = self.pool().stats()
+            POOL_WORKERS.set(stats["workers"])
+            POOL_IN_FLIGHT.set(stats["running"])
+            POOL_QUEUED.set(stats["queued"])
+
+            loaded = set()
+            for model in self.registry.status()["models"]:
+                labels = (model["engine"], model["variant"])
+                loaded.add(labels)
+                MODEL_MEMORY.labels(*labels).set(model["size_mb"] * 2**20)
+                MODEL_LOAD_SECONDS.labels(*labels).set(model["load_time"])
+            # Zeroed rather than removed: other workers' files keep removed labels anyway
+            for labels in self.models - loaded:
+                MODEL_MEMORY.labels(*labels).set(0)
+                MODEL_LOAD_SECONDS.labels(*labels).set(0)
+            self.models |= loaded
+
+            cache = self.transcription_cache.stats()
+            counts = {"memory_hit": cache["hits"] - cache["disk_hits"], "disk_hit": cache["disk_hits"], "miss": cache["misses"]}
+            for result, count in counts.items():
+                if count > self.cache_counts[result]:
+                    CACHE_LOOKUPS.labels(result).inc(count - self.cache_counts[result])
+            self.cache_counts = counts
+
+    def run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Could not refresh runtime metrics: {e}")
+            time.sleep(REFRESH_SECONDS)
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="metrics-refresh", daemon=True)
+            self.thread.start()
+
+def process_exited():
+    """Drop this worker's live gauges from the shared metrics directory"""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+def render():
+    """Current metrics in the Prometheus text format, with its content type"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
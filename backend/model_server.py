@@ -0,0 +1,226 @@
+"""
+Model server: inference worker processes that share one copy of the model weights
+
+Without it, every uvicorn worker loads its own Whisper and Vosk models. In
+model-server mode the models are loaded once in a parent process, which
+then forks the inference workers; the weights are inherited copy-on-write
+and are only read, so the workers share the same physical pages. The API
+workers send the audio over a local socket and get the transcript back.
+
+Start it from the backend directory, then point the API at it with the
+same secret key:
+    export STT_MODEL_SERVER_KEY=$(python -c "import secrets; print(secrets.token_hex(32))")
+    STT_MODEL_SERVER=/tmp/stt-models.sock python -m model_server
+    STT_MODEL_SERVER=/tmp/stt-models.sock uvicorn main:app --workers 4
+
+Every request uses its own connection. Only idle workers wait in accept(),
+so the kernel hands each request to a worker that is free.
+"""
+import os
+import gc
+import time
+import signal
+import logging
+import threading
+import multiprocessing
+from multiprocessing.connection import Listener, Client, answer_challenge, deliver_challenge
+import numpy as np
+from worker_pool import REQUEST_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Model server configuration (environment variables)
+#   STT_MODEL_SERVER           unix socket path (or host:port) of the model server; unset = run models in-process
+#   STT_MODEL_SERVER_KEY       shared secret that authenticates API workers to the server (required:
+#                              requests are pickled, so anyone holding the key can run code in it)
+#   STT_MODEL_SERVER_WORKERS   inference processes forked by the server
+#   STT_MODEL_SERVER_THREADS   torch threads per inference process (default: CPUs / workers)
+#   STT_PRELOAD                models loaded before forking (default: the Whisper model and Vosk
+#                              English, for whichever of the two STT_ENGINES enables)
+MODEL_SERVER = os.getenv("STT_MODEL_SERVER", "")
+AUTHKEY = os.getenv("STT_MODEL_SERVER_KEY", "").encode()
+WORKERS = int(os.getenv("STT_MODEL_SERVER_WORKERS", 2))
+THREADS = int(os.getenv("STT_MODEL_SERVER_THREADS", 0))
+
+# Engines whose models live in the server; Google is only an API call
+MODEL_SERVER_ENGINES = ("whisper", "vosk")
+
+# Connections waiting for an idle worker; the default of 1 would block connect() instead
+BACKLOG = 128
+
+class ModelServerTimeout(TimeoutError):
+    """The model server did not answer before the request's deadline"""
+
+def check_authkey():
+    if not AUTHKEY:
+        raise Exception("STT_MODEL_SERVER_KEY must be set to a secret shared by the API and the model server")
+
+def parse_address(address):
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and not address.startswith("/"):
+        return (host or "127.0.0.1", int(port))
+    return address
+
+class ModelServerClient:
+    """Sends inference requests to the model server, one connection per request"""
+
+    def __init__(self, address=MODEL_SERVER, authkey=AUTHKEY):
+        self.address = parse_address(address)
+        self.authkey = authkey
+
+    def infer(self, service, samples, language, session_id=None, timeout=5, timings=None, request_timeout=None):
+        """
+        Same contract as inference.infer(), executed by a model server worker
+
+        request_timeout (default STT_REQUEST_TIMEOUT) bounds the wait for a
+        free worker and for its answer, so a hung worker cannot hold the
+        calling pool thread, and with it the engine's concurrency slot, forever.
+
+        Raises:
+            ModelServerTimeout: no answer within request_timeout
+        """
+        timings = {} if timings is None else timings
+        request_timeout = REQUEST_TIMEOUT if request_timeout is None else request_timeout
+        deadline = time.monotonic() + request_timeout
+
+        def wait(conn):
+            if not conn.poll(max(deadline - time.monotonic(), 0)):
+                raise ModelServerTimeout(f"Model server did not answer within {request_timeout}s")
+
+        # Authenticate by hand: Client(authkey=...) would block in the handshake
+        # until a worker is free to accept the connection
+        with Client(self.address) as conn:
+            wait(conn)
+            answer_challenge(conn, self.authkey)
+            deliver_challenge(conn, self.authkey)
+            conn.send((service, language, session_id, timeout, samples is not None))
+            if samples is not None:
+                conn.send_bytes(samples.astype(np.int16, copy=False).tobytes())
+            wait(conn)
+            status, payload = conn.recv()
+        if status != "ok":
+            raise Exception(f"Model server error: {payload}")
+        for stage, seconds in payload.pop("timings").items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+        return {**payload, "timings": timings}
+
+client = None
+client_lock = threading.Lock()
+
+def get_client():
+    """The model server client, or None when models run in-process"""
+    global client
+    if not MODEL_SERVER:
+        return None
+    check_authkey()
+    with client_lock:
+        if client is None:
+            client = ModelServerClient()
+    return client
+
+def handle(conn):
+    from inference import infer
+    service, language, session_id, timeout, has_audio = conn.recv()
+    samples = np.frombuffer(conn.recv_bytes(), dtype=np.int16) if has_audio else None
+    try:
+        result = infer(service, samples, language, session_id, timeout)
+        conn.send(("ok", result))
+    except Exception as e:
+        logger.error(f"Inference error: {e}")
+        conn.send(("error", str(e)))
+
+def serve(listener, threads):
+    """Inference worker: answer requests until the parent stops us"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    from services import ENABLED_ENGINES
+    if "whisper" in ENABLED_ENGINES:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_grad_enabled(False)
+    logger.info(f"Inference worker {os.getpid()} ready ({threads} threads)")
+    while True:
+        try:
+            with listener.accept() as conn:
+                handle(conn)
+        except (EOFError, OSError) as e:
+            logger.warning(f"Dropped model server connection: {e}")
+        except Exception as e:
+            # Usually a client that failed authentication
+            logger.warning(f"Rejected model server connection: {e}")
+
+def load_models(specs):
+    from services.model_registry import registry
+    for engine, variant in specs:
+        # Load only: running inference here would start torch's thread pools,
+        # which do not survive a fork. Each worker warms up on its first request.
+        model = registry.get(engine, variant)
+        if engine == "whisper":
+            model.eval()
+            model.requires_grad_(False)
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    if not MODEL_SERVER:
+        raise SystemExit("Set STT_MODEL_SERVER to the socket path (or host:port) to listen on")
+    try:
+        check_authkey()
+    except Exception as e:
+        raise SystemExit(str(e))
+
+    from services import ENABLED_ENGINES
+    from services.engine_config import WHISPER_MODEL_SIZE
+    from services.model_registry import parse_specs, PRELOAD
+    defaults = []
+    if "whisper" in ENABLED_ENGINES:
+        defaults.append(f"whisper:{WHISPER_MODEL_SIZE}")
+    if "vosk" in ENABLED_ENGINES:
+        defaults.append("vosk:en")
+    specs = parse_specs(PRELOAD or ",".join(defaults))
+    workers = WORKERS
+    if "whisper" in ENABLED_ENGINES:
+        import torch
+        if torch.cuda.is_available() and workers > 1:
+            # CUDA contexts cannot be inherited across fork
+            logger.warning("CUDA is available: running a single inference worker")
+            workers = 1
+
+    started = time.monotonic()
+    load_models(specs)
+    logger.info(f"Loaded {specs} in {time.monotonic() - started:.1f}s")
+
+    address = parse_address(MODEL_SERVER)
+    if isinstance(address, str) and os.path.exists(address):
+        os.unlink(address)  # stale socket from a previous run
+    listener = Listener(address, backlog=BACKLOG, authkey=AUTHKEY)
+    threads = THREADS or max((os.cpu_count() or 1) // workers, 1)
+
+    # Keep the inherited objects out of the cyclic GC's bookkeeping, which
+    # would otherwise write to (and so copy) every page that holds them
+    gc.freeze()
+    context = multiprocessing.get_context("fork")
+    processes = []
+
+    def spawn():
+        process = context.Process(target=serve, args=(listener, threads), daemon=True)
+        process.start()
+        return process
+
+    def stop(*_):
+        for process in processes:
+            process.terminate()
+        listener.close()
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    processes.extend(spawn() for _ in range(workers))
+    logger.info(f"Model server listening on {MODEL_SERVER} with {workers} workers")
+    while True:
+        time.sleep(1)
+        for i, process in enumerate(processes):
+            if not process.is_alive():
+                logger.error(f"Inference worker {process.pid} exited ({process.exitcode}), restarting")
+                processes[i] = spawn()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import os
+import importlib
+
+# Engine configuration (environment variables)
+#   STT_ENGINES   engines this deployment serves, e.g. "vosk" or "whisper,vosk" (default: all)
+#
+# Each engine's module pulls in its heavy dependencies (torch and whisper,
+# vosk and pyaudio, speech_recognition), so it is only imported the first
+# time the engine is used, and never when the engine is not enabled.
+ENGINE_MODULES = {
+    "google": "services.google_service",
+    "whisper": "services.whisper_service",
+    "vosk": "services.vosk_service",
+}
+
+def parse_engines(value):
+    engines = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in engines if name not in ENGINE_MODULES]
+    if unknown:
+        raise Exception(f"Unknown engines in STT_ENGINES: {', '.join(unknown)}")
+    return engines or list(ENGINE_MODULES)
+
+ENABLED_ENGINES = parse_engines(os.getenv("STT_ENGINES", ""))
+
+def get_engine(name):
+    """The service module of an enabled engine, imported on first use"""
+    if name not in ENABLED_ENGINES:
+        raise Exception(f"Engine {name} is not enabled (STT_ENGINES={','.join(ENABLED_ENGINES)})")
+    return importlib.import_module(ENGINE_MODULES[name])
@@ -0,0 +1,192 @@
+import logging
+import subprocess
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# All engines run on 16 kHz mono 16-bit PCM
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+# WAV format tags
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+# Sample dtypes decoded in-process, by (format tag, bits per sample)
+WAV_DTYPES = {
+    (WAVE_FORMAT_PCM, 8): np.uint8,
+    (WAVE_FORMAT_PCM, 16): np.dtype("<i2"),
+    (WAVE_FORMAT_PCM, 32): np.dtype("<i4"),
+    (WAVE_FORMAT_IEEE_FLOAT, 32): np.dtype("<f4"),
+}
+
+# Raw 16-bit PCM content types and their byte order
+PCM_DTYPES = {
+    "audio/pcm": np.dtype("<i2"),
+    "audio/x-raw": np.dtype("<i2"),
+    "audio/l16": np.dtype(">i2"),  # network byte order, RFC 2586
+}
+
+class AudioFormatError(ValueError):
+    """The upload, or its declared format, cannot be decoded"""
+
+def pcm_parameter(params, name, default):
+    value = params.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise AudioFormatError(f"Invalid {name}= in the audio content type: {value!r}")
+    if value < 1:
+        raise AudioFormatError(f"Invalid {name}= in the audio content type: {value}")
+    return value
+
+def decode_audio(data, content_type=None):
+    """
+    Decode an uploaded audio buffer to 16 kHz mono int16 samples
+
+    WAV and raw PCM are decoded in-process; 16 kHz mono 16-bit input comes
+    back as a zero-copy view of data. Other rates and channel counts are
+    downmixed and resampled with numpy. Only compressed formats go through ffmpeg.
+
+    Args:
+        data: Raw bytes of the uploaded file
+        content_type: MIME type sent by the client, used to recognise raw PCM
+                      ('audio/pcm' little-endian, 'audio/l16' big-endian as in
+                      RFC 2586), optionally with rate= and channels= parameters
+                      (default 16000 and 1)
+
+    Returns:
+        numpy.ndarray: int16 samples at SAMPLE_RATE
+
+    Raises:
+        AudioFormatError: bad rate= or channels= parameters, a WAV header
+                          with no sample rate or channels, or data ffmpeg
+                          cannot decode
+    """
+    if not data:
+        return np.array([], dtype=np.int16)
+
+    content_type = (content_type or "").lower()
+    if content_type.split(";")[0].strip() in PCM_DTYPES:
+        params = dict(part.strip().partition("=")[::2] for part in content_type.split(";")[1:])
+        samples = np.frombuffer(data, dtype=PCM_DTYPES[content_type.split(";")[0].strip()], count=len(data) // SAMPLE_WIDTH)
+        return to_16k_mono(samples, pcm_parameter(params, "rate", SAMPLE_RATE), pcm_parameter(params, "channels", 1))
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        wav = parse_wav(data)
+        if wav is not None:
+            samples, sample_rate, channels = wav
+            return to_16k_mono(samples, sample_rate, channels)
+
+    # Compressed input (webm/opus, ogg, mp3...) or a WAV encoding not handled above
+    return decode_with_ffmpeg(data)
+
+def parse_wav(data):
+    """
+    Find the fmt and data chunks of a WAV file without copying the samples
+
+    Returns:
+        tuple: (samples view, sample_rate, channels), or None when the
+               encoding is not one of WAV_DTYPES
+    """
+    view = memoryview(data)
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = bytes(view[offset:offset + 4])
+        size = int.from_bytes(view[offset + 4:offset + 8], "little")
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            tag = int.from_bytes(view[body:body + 2], "little")
+            channels = int.from_bytes(view[body + 2:body + 4], "little")
+            sample_rate = int.from_bytes(view[body + 4:body + 8], "little")
+            bits = int.from_bytes(view[body + 14:body + 16], "little")
+            if tag == WAVE_FORMAT_EXTENSIBLE and size >= 40:
+                tag = int.from_bytes(view[body + 24:body + 26], "little")  # first bytes of the subformat GUID
+            fmt = (tag, bits, channels, sample_rate)
+        elif chunk_id == b"data" and fmt is not None:
+            tag, bits, channels, sample_rate = fmt
+            dtype = WAV_DTYPES.get((tag, bits))
+            if dtype is None or channels < 1:
+                return None
+            dtype = np.dtype(dtype)
+            # Streamed WAVs may leave the size at 0 or 0xFFFFFFFF, read to the end then
+            available = len(data) - body
+            length = size if 0 < size <= available else available
+            count = length // (dtype.itemsize * channels) * channels
+            return np.frombuffer(data, dtype=dtype, count=count, offset=body), sample_rate, channels
+        offset = body + size + (size & 1)  # chunks are word aligned
+    return None
+
+def to_16k_mono(samples, sample_rate, channels=1):
+    """Downmix, resample and convert to int16 as needed; 16 kHz mono int16 is returned as-is"""
+    if sample_rate < 1 or channels < 1:
+        raise AudioFormatError(f"Invalid audio format: {sample_rate} Hz, {channels} channels")
+    if channels == 1 and sample_rate == SAMPLE_RATE:
+        return to_int16(samples)
+    samples = to_unit_float(samples)
+    if channels > 1:
+        # A trailing partial frame is dropped
+        samples = samples[:samples.size // channels * channels].reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    return to_int16(resample(samples, sample_rate, SAMPLE_RATE))
+
+def resample(samples, orig_rate, target_rate=SAMPLE_RATE):
+    """
+    Band-limited resampling of float32 samples in the frequency domain
+
+    The spectrum is truncated (or zero-padded) to the new length, which also
+    removes everything above the new Nyquist frequency before decimating.
+    """
+    if orig_rate == target_rate or samples.size == 0:
+        return samples
+    length = int(round(samples.size * target_rate / orig_rate))
+    spectrum = np.fft.rfft(samples)
+    bins = length // 2 + 1
+    if bins <= spectrum.size:
+        spectrum = spectrum[:bins]
+    else:
+        spectrum = np.concatenate([spectrum, np.zeros(bins - spectrum.size, dtype=spectrum.dtype)])
+    resampled = np.fft.irfft(spectrum, length) * (length / samples.size)
+    return resampled.astype(np.float32)
+
+def to_unit_float(samples):
+    """Samples of any decoded dtype as float32 in [-1, 1]"""
+    if samples.dtype == np.float32:
+        return samples
+    if samples.dtype == np.uint8:
+        return np.multiply(samples.astype(np.int16) - 128, np.float32(1 / 128), dtype=np.float32)
+    scale = np.float32(1 / 2 ** (8 * samples.dtype.itemsize - 1))
+    return np.multiply(samples, scale, dtype=np.float32)
+
+def to_int16(samples):
+    """Convert samples of any decoded dtype to int16, without copying int16 input"""
+    if samples.dtype == np.int16:
+        return samples
+    if samples.dtype == np.uint8:
+        return ((samples.astype(np.int16) - 128) << 8)
+    if samples.dtype.kind == "i":
+        return (samples >> (8 * samples.dtype.itemsize - 16)).astype(np.int16)
+    scaled = np.multiply(samples, 32768.0, dtype=np.float32)
+    return np.clip(scaled, -32768, 32767, out=scaled).astype(np.int16)
+
+def decode_with_ffmpeg(data):
+    cmd = [
+        "ffmpeg", "-nostdin", "-loglevel", "error",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "pipe:1",
+    ]
+    # Either way the upload cannot be decoded here, which is reported as a bad request
+    try:
+        out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    except FileNotFoundError:
+        logger.error("ffmpeg is not installed, only WAV and raw PCM uploads can be decoded")
+        raise AudioFormatError("Unsupported audio format: send WAV or raw PCM (ffmpeg is not installed)")
+    except subprocess.CalledProcessError as e:
+        raise AudioFormatError(f"Failed to decode audio: {e.stderr.decode(errors='ignore').strip()}")
+    return np.frombuffer(out, dtype=np.int16)
+
+def to_float32(samples):
+    """Convert int16 PCM samples to float32 in [-1, 1] as expected by Whisper"""
+    # One pass and one allocation, instead of astype() followed by a division
+    return np.multiply(samples, np.float32(1 / 32768.0), dtype=np.float32)
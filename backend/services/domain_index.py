@@ -0,0 +1,159 @@
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Domain correction configuration (environment variables)
+#   STT_KNOWN_DOMAINS_FILE   extra known domains, one per line ('#' starts a comment)
+#   STT_KNOWN_TLDS_FILE      extra TLDs to correct towards, one per line
+#   STT_DOMAIN_MAX_DISTANCE  largest edit distance that is still corrected
+KNOWN_DOMAINS_FILE = os.getenv("STT_KNOWN_DOMAINS_FILE", "")
+KNOWN_TLDS_FILE = os.getenv("STT_KNOWN_TLDS_FILE", "")
+MAX_DISTANCE = int(os.getenv("STT_DOMAIN_MAX_DISTANCE", 2))
+
+# Every real TLD; an address ending in one is left alone
+IANA_TLDS_FILE = os.path.join(os.path.dirname(__file__), "tlds.txt")
+
+DEFAULT_DOMAINS = [
+    "gmail.com", "googlemail.com", "yahoo.com", "yahoo.co.in", "yahoo.in", "ymail.com",
+    "hotmail.com", "outlook.com", "live.com", "msn.com", "icloud.com", "me.com",
+    "aol.com", "protonmail.com", "proton.me", "zoho.com", "zohomail.in",
+    "rediffmail.com", "gmx.com", "mail.com", "yandex.com",
+]
+# The TLDs a misheard one is corrected to
+DEFAULT_TLDS = [
+    "com", "org", "net", "edu", "gov", "io", "co", "in", "co.in", "org.in",
+    "ac.in", "co.uk", "uk", "us", "ai", "me", "info", "biz",
+]
+
+def edit_distance(a, b):
+    """Levenshtein distance"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def deletions(word, max_distance):
+    """Every string obtained by deleting up to max_distance characters from word"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+class DeletionIndex:
+    """
+    Symmetric-deletion index for bounded edit-distance lookups
+
+    Two words within edit distance d share a string reachable from both by at
+    most d deletions. Every deletion variant of the known words is stored
+    once at build time; a lookup generates the variants of the query, so it
+    only computes real distances for the handful of words sharing one,
+    independent of how many words are indexed.
+    """
+
+    def __init__(self, words=(), max_distance=2):
+        self.max_distance = max_distance
+        self.variants = {}
+        self.size = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        self.size += 1
+        for variant in deletions(word, self.max_distance):
+            self.variants.setdefault(variant, set()).add(word)
+
+    def search(self, word, max_distance):
+        """Return [(distance, word)] within max_distance, closest first"""
+        max_distance = min(max_distance, self.max_distance)
+        candidates = set()
+        for variant in deletions(word, max_distance):
+            candidates |= self.variants.get(variant, set())
+        found = []
+        for candidate in candidates:
+            if abs(len(candidate) - len(word)) <= max_distance:
+                distance = edit_distance(word, candidate)
+                if distance <= max_distance:
+                    found.append((distance, candidate))
+        # Closest first; among equals prefer substitutions over insertions/deletions
+        return sorted(found, key=lambda match: (match[0], abs(len(match[1]) - len(word)), match[1]))
+
+def load_words(path, defaults):
+    words = list(defaults)
+    if path:
+        try:
+            with open(path) as f:
+                words.extend(line.split("#")[0].strip().lower() for line in f)
+        except OSError as e:
+            logger.error(f"Could not read {path}: {e}")
+    return [word for word in words if word]
+
+class DomainCorrector:
+    def __init__(self, domains, tlds, registered_tlds=(), max_distance=MAX_DISTANCE):
+        self.domains = set(domains)
+        # Only the last label is checked, so "co.uk" is indexed as "uk"
+        self.tlds = {tld.rpartition(".")[2] for tld in tlds}
+        self.registered_tlds = set(registered_tlds) | self.tlds
+        self.domain_index = DeletionIndex(self.domains, max_distance)
+        self.tld_index = DeletionIndex(self.tlds, 1)
+        self.max_distance = max_distance
+        logger.info(f"Indexed {len(self.domains)} known domains and {len(self.tlds)} TLDs")
+
+    def closest(self, index, word, max_distance, accept=None):
+        # Only correct when there is a single best candidate
+        matches = [match for match in index.search(word, max_distance) if accept is None or accept(match[1])]
+        if not matches:
+            return None
+        best = (matches[0][0], abs(len(matches[0][1]) - len(word)))
+        if len(matches) > 1 and (matches[1][0], abs(len(matches[1][1]) - len(word))) == best:
+            return None
+        return matches[0][1]
+
+    def allowed_distance(self, word):
+        # Short names are too close to each other to correct two edits away
+        return min(self.max_distance, 1 if len(word) < 9 else 2)
+
+    def correct_domain(self, domain):
+        domain = domain.lower()
+        if domain in self.domains:
+            return domain
+        name, dot, tld = domain.rpartition(".")
+        real_tld = bool(dot) and tld in self.registered_tlds
+        # A real TLD is never changed, so yahoo.co.uk is not a misheard yahoo.co.in;
+        # only the known domains ending in the same TLD are candidates
+        same_tld = (lambda known: known.rpartition(".")[2] == tld) if real_tld else None
+        match = self.closest(self.domain_index, domain, self.allowed_distance(domain), same_tld)
+        if match:
+            return match
+
+        # Unknown domain: only the TLD can be checked, and a real one is kept
+        if dot and not real_tld:
+            fixed_tld = self.closest(self.tld_index, tld, 1)
+            if fixed_tld:
+                return f"{name}.{fixed_tld}"
+        return domain
+
+    def correct_email(self, email):
+        username, at, domain = email.rpartition("@")
+        if not at:
+            return email
+        corrected = self.correct_domain(domain)
+        if corrected != domain:
+            logger.info(f"Corrected email domain: '{domain}' -> '{corrected}'")
+        return f"{username}@{corrected}"
+
+corrector = DomainCorrector(
+    load_words(KNOWN_DOMAINS_FILE, DEFAULT_DOMAINS),
+    load_words(KNOWN_TLDS_FILE, DEFAULT_TLDS),
+    load_words(IANA_TLDS_FILE, []),
+)
+
+def correct_email_domain(email):
+    return corrector.correct_email(email)
@@ -0,0 +1,25 @@
+import os
+
+# Settings of the local engines that the API process needs without loading
+# them (the transcription cache key names the model). This module must not
+# import torch, whisper, vosk or pyaudio.
+
+# Whisper model size: "tiny", "base", "small", "medium", "large-v2"
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL", "small")
+#   WHISPER_QUANTIZE   "int8" applies dynamic int8 quantisation to the linear layers
+#                      (CPU only); empty keeps the float32 model
+WHISPER_QUANTIZE = os.getenv("WHISPER_QUANTIZE", "")
+
+def whisper_model_id():
+    """Identifies the configured Whisper model, including its quantisation"""
+    return f"{WHISPER_MODEL_SIZE}-{WHISPER_QUANTIZE}" if WHISPER_QUANTIZE else WHISPER_MODEL_SIZE
+
+# Vosk model directory per language; only the requested language is loaded
+VOSK_MODEL_PATHS = {
+    'en': "vosk-model-en-in-0.5",
+    'hi': "vosk-model-hi-0.22",
+}
+
+def vosk_model_language(language):
+    # Anything other than English is served by the Hindi model
+    return language if language in VOSK_MODEL_PATHS else 'hi'
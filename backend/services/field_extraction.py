@@ -0,0 +1,292 @@
+import re
+import logging
+from services.domain_index import correct_email_domain
+
+logger = logging.getLogger(__name__)
+
+# Everything below is compiled once at import and shared by all engines, so
+# a field is extracted the same way whichever engine produced the transcript.
+
+# Trigger phrases that introduce a field, longest first so that the
+# alternation prefers "my email address is" over "email"
+TRIGGERS = {
+    "email": ["my email address is", "email address is", "my email is", "email is", "mail id", "contact me at", "reach me at", "email"],
+    "candidate_name": ["my name is", "name is", "this is", "i am", "i'm", "im"],
+    "current_designation": ["my designation is", "i work as", "i am a", "i'm a", "role is", "as a"],
+    "address": ["my address is", "address is", "i live at", "located at", "residing at"],
+}
+
+def alternation(phrases):
+    return "|".join(re.escape(phrase) for phrase in sorted(phrases, key=len, reverse=True))
+
+# Words that join a field's value to the rest of the sentence ("Anita Rao and
+# I have been working ...", "data scientist for three years")
+CONNECTIVES = ["and", "but", "for", "with", "since", "because", "who", "which", "where", "so"]
+# One word of a name: not a connective or one of the words that follow "i am" in a sentence
+NOT_NAME_WORDS = CONNECTIVES + ["i", "am", "is", "my", "the", "a", "an", "have", "has", "been",
+                                "working", "work", "currently", "from", "here", "not", "looking"]
+NAME_WORD = rf"(?!(?:{alternation(NOT_NAME_WORDS)})\b)[A-Z][a-z]+"
+
+# Fallback patterns tried after the trigger pattern of each field
+PATTERNS = {
+    "candidate_name": [
+        rf"(?:{alternation(TRIGGERS['candidate_name'])})\s+({NAME_WORD}(?:\s+{NAME_WORD})+)",
+        r"^([A-Z][a-z]+\s+[A-Z][a-z]+)$",
+        r"([A-Z][a-z]+ [A-Z][a-z]+)",
+    ],
+    "years_of_experience": [
+        r"(\d+)\s*(?:years|yrs|year|y)",
+        r"experience of (\d+)\s*years",
+        r"(\d+)\s*\+?\s*years? exp",
+        r"(\d+)\s+yoe",
+        r"(\d+)\s+years of experience",
+    ],
+    "current_designation": [
+        rf"(?:{alternation(TRIGGERS['current_designation'])})\s+([a-z ]+)",
+        r"^([a-z ]+)$",
+    ],
+    "address": [
+        rf"(?:{alternation(TRIGGERS['address'])})\s+([a-z0-9, ]+)",
+        r"^([a-z0-9, ]+)$",
+    ],
+}
+COMPILED_PATTERNS = {
+    field: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    for field, patterns in PATTERNS.items()
+}
+
+EMAIL_TRIGGER_RE = re.compile(rf"(?:{alternation(TRIGGERS['email'])})\s+(.+)", re.IGNORECASE)
+EMAIL_RE = re.compile(r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b")
+EMAIL_FULL_RE = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+
+# Spoken forms of the characters in an address, translated in a single pass
+SPOKEN_SYMBOLS = {
+    "at the rate": "@", "at the symbol": "@", "at sign": "@", "at": "@", "add": "@",
+    "dot": ".", "period": ".", "full stop": ".", "point": ".",
+    "dash": "-", "hyphen": "-", "minus": "-",
+    "underscore": "_", "under score": "_",
+    "plus": "+",
+}
+SPOKEN_SYMBOL_RE = re.compile(rf"\b(?:{alternation(SPOKEN_SYMBOLS)})\b")
+WHITESPACE_RE = re.compile(r"\s+")
+REPEATED_SYMBOL_RE = re.compile(r"([@.])\1+")
+
+# Garbled transcriptions of "@word@domain"; misspelt domains are fixed by services.domain_index
+LEADING_AT_RE = re.compile(r"^@([a-zA-Z0-9]+)@")
+WORD_BEFORE_AT_RE = re.compile(r"(\w+)\s*@")
+USERNAME_JUNK_RE = re.compile(r"[^a-zA-Z0-9._-]")
+DOMAIN_JUNK_RE = re.compile(r"[^a-zA-Z0-9.-]")
+
+def is_english(language):
+    return language in (None, "en", "english")
+
+def clean_email(text):
+    """Turn a spoken address ("john dot smith at gmail dot com") into its written form"""
+    if not text:
+        return ""
+    text = SPOKEN_SYMBOL_RE.sub(lambda m: SPOKEN_SYMBOLS[m.group(0)], text.lower().strip())
+    text = WHITESPACE_RE.sub("", text)
+    return REPEATED_SYMBOL_RE.sub(r"\1", text)
+
+def extract_email_from_speech(transcript):
+    """
+    Extract email from speech transcript with better handling of spoken formats and malformed patterns
+    """
+    if not transcript:
+        return ""
+
+    text = transcript.lower().strip()
+
+    # Drop the lead-in ("my email is ...") so it does not end up in the username,
+    # falling back to the whole transcript if the trigger was a false match
+    trigger = EMAIL_TRIGGER_RE.search(text)
+    if trigger:
+        email = parse_email(trigger.group(1).strip())
+        if email:
+            return email
+
+    email = parse_email(text)
+    if not email:
+        logger.warning(f"Could not extract valid email from: '{transcript}'")
+    return email
+
+def parse_email(text):
+    email = find_email(text)
+    return correct_email_domain(email) if email else ""
+
+def find_email(text):
+    # Already properly formatted
+    match = EMAIL_RE.search(text)
+    if match:
+        return match.group(0)
+
+    # Malformed patterns like @ther@egmail.com
+    if "@" in text:
+        processed_text = LEADING_AT_RE.sub(r"\1@", text)
+        if processed_text.startswith("@") and not processed_text.startswith("@@"):
+            preceding_word = WORD_BEFORE_AT_RE.search(text)
+            if preceding_word:
+                processed_text = preceding_word.group(1) + processed_text
+        match = EMAIL_RE.search(processed_text)
+        if match:
+            logger.info(f"Fixed email: '{text}' -> '{match.group(0)}'")
+            return match.group(0)
+
+    # Spoken formats
+    processed_text = clean_email(text)
+    match = EMAIL_RE.search(processed_text)
+    if match:
+        logger.info(f"Extracted email via speech processing: '{match.group(0)}'")
+        return match.group(0)
+
+    # Last resort: build a valid address from the parts around the first @
+    if "@" in processed_text:
+        username, _, domain_part = processed_text.partition("@")
+        username = USERNAME_JUNK_RE.sub("", username)
+        domain_part = DOMAIN_JUNK_RE.sub("", domain_part)
+        if "." not in domain_part:
+            domain_part += ".com"
+        potential_email = f"{username}@{domain_part}"
+        if EMAIL_FULL_RE.match(potential_email):
+            logger.info(f"Constructed valid email: '{potential_email}'")
+            return potential_email
+
+    return ""
+
+def extract_single_field(transcript, field, language="en"):
+    """
+    Extract a form field from a transcript
+
+    Args:
+        transcript: The transcribed text
+        field: Field to extract (email, candidate_name, years_of_experience, etc.)
+        language: Language of the transcript; only English is parsed, other
+                  languages return the transcript as-is
+
+    Returns:
+        str: Extracted field value
+    """
+    if not transcript:
+        return ""
+
+    try:
+        value = match_field(transcript, field, language)
+    except Exception as e:
+        logger.error(f"Extraction error: {e}")
+        return transcript
+    if value is None:
+        return "" if field == "email" else transcript
+    return value
+
+def match_field(transcript, field, language="en"):
+    """
+    Like extract_single_field, but None when the field was not found instead
+    of falling back to the whole transcript. Non-English transcripts are not
+    parsed and are returned whole.
+    """
+    if not transcript:
+        return None
+    if not is_english(language):
+        logger.info(f"Non-English language detected: {language}. Returning transcript as-is.")
+        return transcript
+
+    if field == "email":
+        return extract_email_from_speech(transcript) or None
+
+    for pattern in COMPILED_PATTERNS.get(field, []):
+        match = pattern.search(transcript)
+        if match:
+            value = match.group(1).strip()
+            logger.info(f"Extracted {field}: {value}")
+            return value
+    return None
+
+# Whole-form extraction: one regex finds every trigger (and the experience
+# figure) in a single pass; the text between two matches belongs to the
+# field of the first. Designation comes before name so "i am a" wins over "i am".
+FORM_FIELDS = ["candidate_name", "years_of_experience", "current_designation", "address", "email"]
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18,
+    "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40,
+}
+FORM_RE = re.compile(
+    rf"\b(?:(?P<years_of_experience>\d+|{alternation(NUMBER_WORDS)})\s*\+?\s*(?:years|year|yrs)\b(?:\s+of\s+experience)?"
+    rf"|(?P<current_designation>{alternation(TRIGGERS['current_designation'])})"
+    rf"|(?P<address>{alternation(TRIGGERS['address'])})"
+    rf"|(?P<email>{alternation(TRIGGERS['email'])})"
+    rf"|(?P<candidate_name>{alternation(TRIGGERS['candidate_name'])}))\b",
+    re.IGNORECASE,
+)
+# Connectives left at the edges of a segment ("..., and I have")
+SEGMENT_EDGE_RE = re.compile(r"^(?:[\s,.;]|and\b|also\b)+|(?:[\s,.;]|\band|\balso|\bi have|\bhaving|\bwith)+$", re.IGNORECASE)
+ARTICLE_RE = re.compile(r"^(?:a|an)\s+", re.IGNORECASE)
+# A segment ends at the first connective; names and designations also end at punctuation
+CONNECTIVE_RE = re.compile(rf"\s*\b(?:{alternation(CONNECTIVES)})\b.*$", re.IGNORECASE | re.DOTALL)
+CLAUSE_END_RE = re.compile(r"\s*[,;.].*$", re.DOTALL)
+# Plausible values; anything else is reported with confidence 0
+NAME_RE = re.compile(rf"{NAME_WORD}(?:\s+{NAME_WORD}){{0,3}}", re.IGNORECASE)
+DESIGNATION_RE = re.compile(r"[a-z][a-z&/-]*(?:\s+[a-z][a-z&/-]*){0,4}", re.IGNORECASE)
+
+def extract_all_fields(transcript, language="en"):
+    """
+    Extract every form field from one utterance
+
+    Args:
+        transcript: The transcribed text
+        language: Language of the transcript; only English is parsed
+
+    Returns:
+        dict: field -> {"value": str, "confidence": float}. Confidence is a
+              heuristic: high when the field was introduced by a trigger
+              phrase and its value parsed cleanly, 0 when it was not found
+              or does not look like a value of the field.
+    """
+    fields = {field: {"value": "", "confidence": 0.0} for field in FORM_FIELDS}
+    if not transcript or not is_english(language):
+        return fields
+
+    try:
+        matches = list(FORM_RE.finditer(transcript))
+        for i, match in enumerate(matches):
+            field = match.lastgroup
+            if fields[field]["confidence"]:
+                continue  # the first plausible mention wins
+
+            if field == "years_of_experience":
+                figure = match.group(field).lower()
+                years = NUMBER_WORDS.get(figure, figure)
+                fields[field] = {"value": str(years), "confidence": 0.95 if figure.isdigit() else 0.85}
+                continue
+
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(transcript)
+            segment = SEGMENT_EDGE_RE.sub("", transcript[match.end():end])
+            if field != "email":
+                segment = CONNECTIVE_RE.sub("", segment)
+            if field in ("candidate_name", "current_designation"):
+                segment = CLAUSE_END_RE.sub("", segment)
+            if not segment:
+                continue
+
+            if field == "email":
+                email = extract_email_from_speech(segment)
+                if email:
+                    fields[field] = {"value": email, "confidence": 0.9}
+            elif field == "candidate_name":
+                name = NAME_RE.match(segment)
+                value = " ".join(word.capitalize() for word in name.group(0).split()) if name else ""
+                if name and name.end() == len(segment):
+                    confidence = 0.9 if " " in value else 0.7
+                else:
+                    confidence = 0.0
+                fields[field] = {"value": value, "confidence": confidence}
+            elif field == "current_designation":
+                segment = ARTICLE_RE.sub("", segment)
+                fields[field] = {"value": segment, "confidence": 0.85 if DESIGNATION_RE.fullmatch(segment) else 0.0}
+            else:
+                fields[field] = {"value": segment, "confidence": 0.85}
+    except Exception as e:
+        logger.error(f"Form extraction error: {e}")
+
+    return fields
@@ -0,0 +1,186 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Registry configuration (environment variables)
+#   STT_PRELOAD           models to load at startup, e.g. "whisper:small,vosk:en"
+#   STT_MODEL_IDLE_TTL    seconds a model may sit unused before it is unloaded (0 = never)
+#   STT_MODEL_MEMORY_MB   cap on the estimated size of loaded models, least recently
+#                         used models are unloaded past it (0 = no cap)
+PRELOAD = os.getenv("STT_PRELOAD", "")
+IDLE_TTL = float(os.getenv("STT_MODEL_IDLE_TTL", 0))
+MEMORY_MB = float(os.getenv("STT_MODEL_MEMORY_MB", 0))
+
+def parse_specs(value):
+    """Parse "engine:variant,engine:variant" into a list of (engine, variant)"""
+    specs = []
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        engine, _, variant = item.partition(":")
+        specs.append((engine.strip(), variant.strip() or None))
+    return specs
+
+class ModelRegistry:
+    """
+    Central place where engines load their models
+
+    Engines register a loader per engine name; models are then looked up by
+    (engine, variant), where the variant is a model size or language. Loaded
+    models are kept in LRU order and unloaded when idle for longer than
+    idle_ttl or when their estimated total size exceeds memory_mb.
+    """
+
+    def __init__(self, idle_ttl=IDLE_TTL, memory_mb=MEMORY_MB):
+        self.idle_ttl = idle_ttl
+        self.memory_bytes = memory_mb * 1024 * 1024
+        self.engines = {}
+        self.models = OrderedDict()  # (engine, variant) -> entry dict, least recently used first
+        self.load_locks = {}
+        self.lock = threading.Lock()
+        self.preloading = False
+        self.sweeper = None
+
+    def register(self, engine, loader, warmup=None, size=None, unload=None):
+        """
+        Register how an engine loads its models
+
+        Args:
+            engine: Engine name ('whisper', 'vosk', ...)
+            loader: loader(variant) -> model
+            warmup: warmup(model, variant), runs one dummy inference after preloading
+            size: size(model, variant) -> estimated bytes held by the model
+            unload: unload(model, variant), called after the model is evicted
+        """
+        self.engines[engine] = {"loader": loader, "warmup": warmup, "size": size, "unload": unload}
+
+    def get(self, engine, variant):
+        key = (engine, variant)
+        with self.lock:
+            entry = self.models.get(key)
+            if entry is not None:
+                entry["last_used"] = time.monotonic()
+                self.models.move_to_end(key)
+                return entry["model"]
+            load_lock = self.load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other models stay available meanwhile
+        with load_lock:
+            with self.lock:
+                entry = self.models.get(key)
+            if entry is None:
+                entry = self.load(engine, variant)
+            return entry["model"]
+
+    def load(self, engine, variant):
+        if engine not in self.engines:
+            # Engines register their loaders when their module is first imported
+            from services import get_engine
+            get_engine(engine)
+        if engine not in self.engines:
+            raise Exception(f"No model loader registered for {engine}")
+        hooks = self.engines[engine]
+        logger.info(f"Loading {engine} model '{variant}'...")
+        started = time.monotonic()
+        model = hooks["loader"](variant)
+        load_time = time.monotonic() - started
+        size = hooks["size"](model, variant) if hooks["size"] else 0
+        logger.info(f"Loaded {engine} model '{variant}' in {load_time:.1f}s (~{size / 2**20:.0f} MB)")
+
+        entry = {
+            "model": model,
+            "size": size,
+            "load_time": load_time,
+            "last_used": time.monotonic(),
+            "warm": False,
+        }
+        with self.lock:
+            self.models[(engine, variant)] = entry
+        self.enforce_memory_cap(keep=(engine, variant))
+        return entry
+
+    def unload(self, key):
+        with self.lock:
+            entry = self.models.pop(key, None)
+        if entry is None:
+            return
+        engine, variant = key
+        hooks = self.engines.get(engine, {})
+        if hooks.get("unload"):
+            hooks["unload"](entry["model"], variant)
+        logger.info(f"Unloaded {engine} model '{variant}'")
+
+    def enforce_memory_cap(self, keep=None):
+        if not self.memory_bytes:
+            return
+        while True:
+            with self.lock:
+                total = sum(entry["size"] for entry in self.models.values())
+                victims = [key for key in self.models if key != keep]
+            if total <= self.memory_bytes or not victims:
+                return
+            logger.info(f"Model memory {total / 2**20:.0f} MB over cap, evicting {victims[0]}")
+            self.unload(victims[0])
+
+    def evict_idle(self):
+        if not self.idle_ttl:
+            return
+        now = time.monotonic()
+        with self.lock:
+            idle = [key for key, entry in self.models.items() if now - entry["last_used"] > self.idle_ttl]
+        for key in idle:
+            logger.info(f"{key[0]} model '{key[1]}' idle for over {self.idle_ttl:.0f}s")
+            self.unload(key)
+
+    def preload(self, specs):
+        """Load and warm up the given (engine, variant) pairs"""
+        self.preloading = True
+        try:
+            for engine, variant in specs:
+                try:
+                    model = self.get(engine, variant)
+                    warmup = self.engines[engine]["warmup"]
+                    if warmup:
+                        started = time.monotonic()
+                        warmup(model, variant)
+                        logger.info(f"Warmed up {engine} model '{variant}' in {time.monotonic() - started:.1f}s")
+                    with self.lock:
+                        if (engine, variant) in self.models:
+                            self.models[(engine, variant)]["warm"] = True
+                except Exception as e:
+                    logger.error(f"Failed to preload {engine} model '{variant}': {e}")
+        finally:
+            self.preloading = False
+
+    def start(self, specs=None):
+        """Preload models in the background and start the idle sweeper"""
+        specs = parse_specs(PRELOAD) if specs is None else specs
+        if specs:
+            self.preloading = True
+            threading.Thread(target=self.preload, args=(specs,), name="model-preload", daemon=True).start()
+        if self.idle_ttl and self.sweeper is None:
+            self.sweeper = threading.Thread(target=self.sweep, name="model-sweeper", daemon=True)
+            self.sweeper.start()
+
+    def sweep(self):
+        interval = min(max(self.idle_ttl / 2, 1), 60)
+        while True:
+            time.sleep(interval)
+            self.evict_idle()
+
+    def status(self):
+        now = time.monotonic()
+        with self.lock:
+            models = [{
+                "engine": engine,
+                "variant": variant,
+                "size_mb": round(entry["size"] / 2**20, 1),
+                "load_time": round(entry["load_time"], 2),
+                "idle": round(now - entry["last_used"], 1),
+                "warm": entry["warm"],
+            } for (engine, variant), entry in self.models.items()]
+        return {"ready": not self.preloading, "models": models}
+
+registry = ModelRegistry()
@@ -0,0 +1,130 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Transcription cache configuration (environment variables)
+#   STT_TRANSCRIPT_CACHE_SIZE      results kept in memory (0 disables the memory tier)
+#   STT_TRANSCRIPT_CACHE_DIR       directory of the on-disk tier (unset disables it)
+#   STT_TRANSCRIPT_CACHE_DISK_MB   size the on-disk tier is trimmed to
+CACHE_SIZE = int(os.getenv("STT_TRANSCRIPT_CACHE_SIZE", 512))
+CACHE_DIR = os.getenv("STT_TRANSCRIPT_CACHE_DIR", "")
+CACHE_DISK_MB = float(os.getenv("STT_TRANSCRIPT_CACHE_DISK_MB", 100))
+
+def cache_key(data, engine, model, language):
+    """Content address of an upload: the same bytes sent to the same engine setup share a key"""
+    digest = hashlib.sha256(data)
+    digest.update(f"\0{engine}\0{model}\0{language or 'auto'}".encode())
+    return digest.hexdigest()
+
+class DiskCache:
+    """
+    JSON files named by key, trimmed oldest-first once they exceed max_bytes
+
+    A hit refreshes the file's modification time, so eviction follows use
+    rather than creation.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(entry.stat().st_size for entry in self.scan())
+        logger.info(f"Transcription disk cache: {directory} ({self.total_bytes / 2**20:.1f} MB used)")
+
+    def scan(self):
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")]
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path) as f:
+                value = json.load(f)
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable cache entry {path}: {e}")
+            return None
+
+    def put(self, key, value):
+        path = self.path(key)
+        body = json.dumps(value).encode()
+        with self.lock:
+            try:
+                previous = os.path.getsize(path) if os.path.exists(path) else 0
+                # Write then rename so readers never see a partial file
+                with open(f"{path}.tmp", "wb") as f:
+                    f.write(body)
+                os.replace(f"{path}.tmp", path)
+            except OSError as e:
+                logger.error(f"Could not write cache entry {path}: {e}")
+                return
+            self.total_bytes += len(body) - previous
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        entries = sorted(self.scan(), key=lambda entry: entry.stat().st_mtime)
+        self.total_bytes = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self.total_bytes -= size
+            except OSError:
+                pass
+
+class TranscriptionCache:
+    """
+    Engine results for uploaded audio, so a retried upload is not transcribed again
+
+    Lookups check memory first, then disk; a disk hit is copied back into memory.
+    """
+
+    def __init__(self, max_entries=CACHE_SIZE, directory=CACHE_DIR, disk_mb=CACHE_DISK_MB):
+        self.memory = LRUCache(max_entries)
+        self.disk = DiskCache(directory, disk_mb * 2**20) if directory else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.disk_hits += 1
+                self.memory.put(key, value)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(value)
+
+    def put(self, key, value):
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": self.memory.stats()["entries"],
+            "disk_mb": round(self.disk.total_bytes / 2**20, 2) if self.disk is not None else None,
+        }
+
+transcription_cache = TranscriptionCache()
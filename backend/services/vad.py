@@ -0,0 +1,137 @@
+import os
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Endpointing configuration (environment variables)
+#   VAD_FRAME_MS              analysis frame length
+#   VAD_TRAILING_SILENCE_MS   silence after speech that ends a capture
+#   VAD_MIN_SPEECH_MS         speech needed before trailing silence can end a capture
+#   VAD_MARGIN_DB             how far above the noise floor a frame must be to count as speech
+#   VAD_MIN_SPEECH_DB         frames quieter than this (dBFS) are never speech
+#   VAD_PADDING_MS            audio kept around the speech when trimming
+FRAME_MS = int(os.getenv("VAD_FRAME_MS", 30))
+TRAILING_SILENCE_MS = int(os.getenv("VAD_TRAILING_SILENCE_MS", 700))
+MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", 150))
+MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", 12))
+MIN_SPEECH_DB = float(os.getenv("VAD_MIN_SPEECH_DB", -50))
+PADDING_MS = int(os.getenv("VAD_PADDING_MS", 200))
+
+def frame_energies(samples, frame_len):
+    """RMS level in dBFS of each complete frame of int16 or float32 samples"""
+    count = len(samples) // frame_len
+    if count == 0:
+        return np.array([], dtype=np.float32)
+    frames = samples[:count * frame_len].reshape(count, frame_len).astype(np.float32)
+    if samples.dtype == np.int16:
+        frames /= 32768.0
+    rms = np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)
+    return 20 * np.log10(rms)
+
+def trim_silence(samples, sample_rate=16000, padding_ms=PADDING_MS):
+    """
+    Cut leading and trailing silence from a complete clip
+
+    Args:
+        samples: int16 or float32 mono samples
+        sample_rate: Sample rate of the clip
+        padding_ms: Audio kept before the first and after the last speech frame
+
+    Returns:
+        numpy.ndarray: A view of the speech part of samples, empty if there is no speech
+    """
+    frame_len = sample_rate * FRAME_MS // 1000
+    energies = frame_energies(samples, frame_len)
+    if energies.size == 0:
+        return samples
+
+    floor = np.percentile(energies, 10)
+    peak = energies.max()
+    if peak < MIN_SPEECH_DB:
+        return samples[:0]
+    if peak - floor < MARGIN_DB:
+        # No quiet part to measure the noise floor from, the whole clip is speech
+        return samples
+
+    threshold = max(floor + min(MARGIN_DB, (peak - floor) / 2), MIN_SPEECH_DB)
+    speech = np.flatnonzero(energies > threshold)
+    padding = sample_rate * padding_ms // 1000
+    start = max(speech[0] * frame_len - padding, 0)
+    end = min((speech[-1] + 1) * frame_len + padding, len(samples))
+    logger.info(f"Trimmed {(len(samples) - (end - start)) / sample_rate:.2f}s of silence")
+    return samples[start:end]
+
+class Endpointer:
+    """
+    Decides when a live capture can stop
+
+    Feed it the captured chunks as they arrive; feed() returns True once at
+    least MIN_SPEECH_MS of speech has been followed by TRAILING_SILENCE_MS of
+    silence. The noise floor is tracked from the non-speech frames.
+    """
+
+    def __init__(self, sample_rate=16000, trailing_silence_ms=TRAILING_SILENCE_MS, min_speech_ms=MIN_SPEECH_MS):
+        self.frame_len = sample_rate * FRAME_MS // 1000
+        self.trailing_frames = max(trailing_silence_ms // FRAME_MS, 1)
+        self.min_speech_frames = max(min_speech_ms // FRAME_MS, 1)
+        self.pending = None
+        self.noise_floor = None
+        self.speech_frames = 0
+        self.silence_run = 0
+        self.done = False
+
+    def feed(self, chunk):
+        if self.pending is not None and len(self.pending):
+            chunk = np.concatenate([self.pending, chunk])
+        energies = frame_energies(chunk, self.frame_len)
+        self.pending = chunk[len(energies) * self.frame_len:]
+
+        for energy in energies:
+            if self.noise_floor is None:
+                self.noise_floor = energy
+            if energy > max(self.noise_floor + MARGIN_DB, MIN_SPEECH_DB):
+                self.speech_frames += 1
+                self.silence_run = 0
+            else:
+                self.silence_run += 1
+                # Follow drops in the floor immediately, rises slowly
+                self.noise_floor = min(energy, 0.95 * self.noise_floor + 0.05 * energy)
+            if self.speech_frames >= self.min_speech_frames and self.silence_run >= self.trailing_frames:
+                self.done = True
+        return self.done
+
+def split_at_silences(samples, sample_rate=16000, max_chunk_s=30, overlap_ms=1000):
+    """
+    Cut a long clip into chunks of at most max_chunk_s seconds
+
+    Each cut is made at the quietest frame in the second half of the chunk.
+    When even that frame is speech (no pause to cut at), the next chunk
+    starts overlap_ms earlier so that the word on the cut is whole in one of
+    the two chunks; the duplicated words are removed when stitching.
+
+    Returns:
+        list: (start, end) sample offsets of the chunks, in order
+    """
+    max_len = int(max_chunk_s * sample_rate)
+    if len(samples) <= max_len:
+        return [(0, len(samples))]
+    frame_len = sample_rate * FRAME_MS // 1000
+    energies = frame_energies(samples, frame_len)
+    # A pause is quiet in absolute terms or far below the loudest speech. A
+    # percentile noise floor would not do: pauses can be under 10% of the clip.
+    threshold = max(MIN_SPEECH_DB, energies.max() - 2 * MARGIN_DB)
+    overlap = sample_rate * overlap_ms // 1000
+
+    chunks = []
+    start = 0
+    while len(samples) - start > max_len:
+        first = (start + max_len // 2) // frame_len
+        last = (start + max_len) // frame_len
+        quietest = first + int(np.argmin(energies[first:last]))
+        # Cut in the middle of the quietest frame
+        end = quietest * frame_len + frame_len // 2
+        chunks.append((start, end))
+        start = end if energies[quietest] <= threshold else max(end - overlap, start + 1)
+    chunks.append((start, len(samples)))
+    return chunks
@@ -1,158 +1,214 @@
 import os
 import json
+import atexit
 import logging
-import re
+import threading
+from contextlib import contextmanager
 from vosk import Model, KaldiRecognizer
 import pyaudio
+import numpy as np
+from services.model_registry import registry
+from services.engine_config import VOSK_MODEL_PATHS as MODEL_PATHS, vosk_model_language as model_language
+from services.vad import Endpointer
+from services.field_extraction import extract_single_field
 
 logger = logging.getLogger(__name__)
 
-# Load models for both languages
-model_en = None
-model_hi = None
-
-def load_models():
-    global model_en, model_hi
-    if model_en is None:
-        model_path_en = "vosk-model-en-in-0.5"
-        if not os.path.exists(model_path_en):
-            raise Exception(f"English model not found at {model_path_en}")
-        model_en = Model(model_path_en)
-       
-    if model_hi is None:
-        model_path_hi = "vosk-model-hi-0.22"
-        if not os.path.exists(model_path_hi):
-            raise Exception(f"Hindi model not found at {model_path_hi}")
-        model_hi = Model(model_path_hi)
-   
-    return model_en, model_hi
+# Microphone read size; 100 ms keeps the endpointer responsive
+CHUNK_FRAMES = 1600
+# Idle recognizers kept per language and sample rate (environment variable)
+RECOGNIZER_POOL_SIZE = int(os.getenv("VOSK_RECOGNIZER_POOL", 4))
+
+def load_vosk_model(language):
+    model_path = MODEL_PATHS[language]
+    if not os.path.exists(model_path):
+        raise Exception(f"{language} model not found at {model_path}")
+    return Model(model_path)
+
+def warmup_model(model, language):
+    recognizer = KaldiRecognizer(model, 16000)
+    recognizer.AcceptWaveform(bytes(16000))  # half a second of silence
+    recognizer.FinalResult()
+
+def model_size(model, language):
+    # Vosk does not report its memory use, the size on disk is a close estimate
+    total = 0
+    for root, _, files in os.walk(MODEL_PATHS[language]):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+def unload_model(model, language):
+    # Pooled recognizers hold a reference to the model, drop them so it can be freed
+    recognizers.clear(language)
+
+registry.register("vosk", load_vosk_model, warmup=warmup_model, size=model_size, unload=unload_model)
+
+def load_model(language='en'):
+    return registry.get("vosk", model_language(language))
+
+def create_recognizer(language, sample_rate=16000):
+    recognizer = KaldiRecognizer(load_model(language), sample_rate)
+    recognizer.SetWords(True)
+    return recognizer
+
+class RecognizerPool:
+    """
+    Recognizers reused across utterances instead of being built per request
+
+    recognizer() hands out an idle recognizer for the language and sample
+    rate (or creates one) and takes it back with Reset() once the utterance
+    is done. A recognizer that raised mid-utterance is not reused.
+    """
+
+    def __init__(self, max_idle=RECOGNIZER_POOL_SIZE):
+        self.max_idle = max_idle
+        self.idle = {}  # (model language, sample rate) -> [recognizer]
+        self.lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    @contextmanager
+    def recognizer(self, language, sample_rate=16000):
+        key = (model_language(language), sample_rate)
+        with self.lock:
+            idle = self.idle.get(key)
+            recognizer = idle.pop() if idle else None
+        if recognizer is None:
+            recognizer = create_recognizer(language, sample_rate)
+            self.created += 1
+        else:
+            self.reused += 1
+
+        yield recognizer
+
+        recognizer.Reset()
+        with self.lock:
+            idle = self.idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(recognizer)
+
+    def clear(self, language):
+        with self.lock:
+            for key in [key for key in self.idle if key[0] == language]:
+                del self.idle[key]
+
+recognizers = RecognizerPool()
+
+audio = None
+audio_lock = threading.Lock()
+
+def get_audio():
+    """
+    The process-wide PyAudio instance. Creating one initialises PortAudio and
+    enumerates every device, so it is done once instead of per capture.
+    """
+    global audio
+    with audio_lock:
+        if audio is None:
+            audio = pyaudio.PyAudio()
+            atexit.register(audio.terminate)
+    return audio
+
+def start_stream(language='en', sample_rate=16000):
+    """Create a recognizer for a streaming session fed chunk by chunk with accept_chunk()"""
+    return create_recognizer(language, sample_rate)
+
+def accept_chunk(recognizer, data):
+    """
+    Feed one chunk of 16-bit mono PCM to a streaming recognizer
+    
+    Returns:
+        dict: {"type": "result", "text": ...} when an utterance was completed,
+              otherwise {"type": "partial", "text": ...}
+    """
+    if recognizer.AcceptWaveform(data):
+        return {"type": "result", "text": json.loads(recognizer.Result()).get('text', '')}
+    return {"type": "partial", "text": json.loads(recognizer.PartialResult()).get('partial', '')}
+
+def finish_stream(recognizer):
+    """Flush the recognizer at the end of a stream and return the last segment"""
+    return json.loads(recognizer.FinalResult()).get('text', '')
+
+def join_results(results):
+    """
+    Combine the Result()/FinalResult() JSON of one utterance
+
+    Returns:
+        tuple: (transcript, mean word confidence or None when no words were recognised)
+    """
+    texts = []
+    confidences = []
+    for result in results:
+        data = json.loads(result)
+        if data.get('text'):
+            texts.append(data['text'])
+        # Per-word confidences are present because of SetWords(True)
+        confidences.extend(word['conf'] for word in data.get('result', []))
+    confidence = sum(confidences) / len(confidences) if confidences else None
+    return " ".join(texts), confidence
 
 def listen_and_transcribe(timeout=5, language='en'):
+    """
+    Record from the microphone until the speaker stops and transcribe it
+
+    Returns:
+        tuple: (transcribed_text, language, mean_word_confidence)
+    """
     try:
-        model_en, model_hi = load_models()
-       
-        # Select model based on language
-        model = model_en if language == 'en' else model_hi
-        recognizer = KaldiRecognizer(model, 16000)
-        recognizer.SetWords(True)
-       
-        p = pyaudio.PyAudio()
-        stream = p.open(format=pyaudio.paInt16, channels=1, rate=16000, input=True, frames_per_buffer=8192)
-        stream.start_stream()
-       
-        logger.info(f"🎙️ Listening for {timeout} seconds... (Language: {language})")
-       
-        result = []
-        for i in range(0, int(16000 / 8192 * timeout)):
-            data = stream.read(8192, exception_on_overflow=False)
-            if recognizer.AcceptWaveform(data):
-                result.append(recognizer.Result())
-       
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
-       
-        final_result = json.loads(recognizer.FinalResult())
-        transcript = final_result.get('text', '')
+        with recognizers.recognizer(language) as recognizer:
+            stream = get_audio().open(format=pyaudio.paInt16, channels=1, rate=16000, input=True, frames_per_buffer=CHUNK_FRAMES)
+            stream.start_stream()
+           
+            logger.info(f"🎙️ Listening for up to {timeout} seconds... (Language: {language})")
+           
+            # Stop as soon as the speaker has finished instead of always waiting for the timeout
+            endpointer = Endpointer(16000)
+            segments = []
+            try:
+                for i in range(0, int(16000 / CHUNK_FRAMES * timeout)):
+                    data = stream.read(CHUNK_FRAMES, exception_on_overflow=False)
+                    if recognizer.AcceptWaveform(data):
+                        segments.append(recognizer.Result())
+                    if endpointer.feed(np.frombuffer(data, dtype=np.int16)):
+                        logger.info(f"End of speech after {(i + 1) * CHUNK_FRAMES / 16000:.1f}s")
+                        break
+            finally:
+                stream.stop_stream()
+                stream.close()
+           
+            segments.append(recognizer.FinalResult())
+        transcript, confidence = join_results(segments)
         logger.info(f"📝 Vosk Recognition: {transcript}")
        
-        return transcript, language
+        return transcript, language, confidence
    
     except Exception as e:
         logger.error(f"Vosk transcription error: {e}")
-        return "", language
-
-def clean_email(text):
-    if not text:
-        return ""
+        return "", language, None
 
-    # Convert to lowercase and remove leading/trailing whitespace
-    text = text.lower().strip()
-    
-    # Replace email-related phrases with symbols
-    replacements = [
-        (r'\b(at the rate|at the symbol|at sign)\b', '@'),
-        (r'\bat\b', '@'),
-        (r'\b(dot|period|full stop|point)\b', '.'),
-        (r'\bunderscore\b', '_'),       
-        (r'\b(dash|hyphen)\b', '-'),
-        (r'\s+', ''),  # Remove all whitespace
-        (r'@+', '@'),  # Replace multiple @ with single @   
-    ]
-    
-    for pattern, replacement in replacements:
-        text = re.sub(pattern, replacement, text)
-    
-    # Final validation - must contain @ and .
-    if '@' not in text or '.' not in text:
-        return text
-    
-    # Capitalize first letter if it's alphabetic
-    if text and text[0].isalpha():
-        text = text[0].upper() + text[1:]
-    
-    return text
+def transcribe_audio(samples, language='en'):
+    """
+    Transcribe 16 kHz mono int16 samples uploaded by the client
 
-def extract_single_field(transcript, field, language='en'):
-    if not transcript:
-        return ""
-   
+    Returns:
+        tuple: (transcribed_text, language, mean_word_confidence)
+    """
     try:
-        if language == 'hi':  # Hindi processing
-            return transcript
-       
-        patterns = {
-            "email": [
-                r"(?:my email is|email is|email|mail id|contact me at)\s+([\w\s@.]+)",
-                r"([\w\s.]+@[\w\s.]+)"
-            ],
-            # Keep other patterns unchanged
-            "candidate_name": [
-                r"(?:my name is|i am|name is|this is|i'm|im)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)",
-                r"^([A-Z][a-z]+\s+[A-Z][a-z]+)$",
-                r"([A-Z][a-z]+ [A-Z][a-z]+)"
-            ],
-            "years_of_experience": [
-                r"(\d+)\s*(?:years|yrs|year|y)",
-                r"experience of (\d+)\s*years",
-                r"(\d+)\s*\+?\s*years? exp",
-                r"(\d+)\s+yoe",
-                r"(\d+)\s+years of experience"
-            ],
-            "current_designation": [
-                r"(?:i am a|my designation is|i work as|i'm a|role is|as a)\s+([a-z ]+)",
-                r"^([a-z ]+)$"
-            ],
-            "address": [
-                r"(?:i live at|my address is|address is|located at|residing at)\s+([a-z0-9, ]+)",
-                r"^([a-z0-9, ]+)$"
-            ]
-        }
-       
-        if field == "email":
-            # First try to extract using patterns
-            for pattern in patterns.get(field, []):
-                match = re.search(pattern, transcript, re.IGNORECASE)
-                if match:
-                    extracted = match.group(1).strip()
-                    cleaned = clean_email(extracted)
-                    if '@' in cleaned and '.' in cleaned:
-                        return cleaned
-            
-            # If no pattern matched, try cleaning the entire transcript
-            cleaned = clean_email(transcript)
-            if '@' in cleaned and '.' in cleaned:
-                return cleaned
-            
-            return transcript
-        
-        # Handle other fields normally
-        for pattern in patterns.get(field, []):
-            match = re.search(pattern, transcript, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
+        with recognizers.recognizer(language) as recognizer:
+            chunk_frames = 8192
+            segments = []
+            # Slice the samples and copy each chunk to bytes once, rather than
+            # copying the whole clip and then every slice of it
+            for offset in range(0, samples.size, chunk_frames):
+                if recognizer.AcceptWaveform(samples[offset:offset + chunk_frames].tobytes()):
+                    segments.append(recognizer.Result())
+           
+            segments.append(recognizer.FinalResult())
+        transcript, confidence = join_results(segments)
+        logger.info(f"📝 Vosk Recognition: {transcript}")
        
-        return transcript
+        return transcript, language, confidence
+   
     except Exception as e:
-        logger.error(f"Extraction error: {e}")
-        return transcript
\ No newline at end of file
+        logger.error(f"Vosk transcription error: {e}")
+        return "", language, None
@@ -0,0 +1,144 @@
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import torch
+import whisper
+
+logger = logging.getLogger(__name__)
+
+# Batching configuration (environment variables)
+#   WHISPER_MAX_BATCH       maximum clips decoded together
+#   WHISPER_BATCH_WAIT_MS   how long the first clip of a batch waits for company
+#   WHISPER_BATCH_TIMEOUT   seconds a caller waits for its clip's batch
+MAX_BATCH_SIZE = int(os.getenv("WHISPER_MAX_BATCH", 8))
+MAX_WAIT_MS = float(os.getenv("WHISPER_BATCH_WAIT_MS", 50))
+BATCH_TIMEOUT = float(os.getenv("WHISPER_BATCH_TIMEOUT", 60))
+
+class BatcherClosed(Exception):
+    """The batcher was closed (its model unloaded) before the clip was decoded"""
+
+class WhisperBatcher:
+    """
+    Micro-batching scheduler around a loaded Whisper model
+
+    Callers block in transcribe() while a single scheduler thread collects the
+    clips that arrive within max_wait_ms (up to max_batch_size), pads them into
+    one mel batch, runs the encoder/decoder once and hands every caller its own
+    result. Only clips up to 30 s fit in a batch; longer ones should go through
+    model.transcribe().
+    """
+
+    def __init__(self, model, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.closed = False
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.clips = 0
+        self.thread = threading.Thread(target=self.run, name="whisper-batcher", daemon=True)
+        self.thread.start()
+
+    def transcribe(self, audio, language=None, timeout=BATCH_TIMEOUT):
+        """
+        Queue a clip and wait for its result
+
+        Args:
+            audio: float32 samples at 16 kHz, at most 30 s long
+            language: Language code, or None to auto-detect
+            timeout: Seconds to wait for the batch to finish
+
+        Returns:
+            tuple: (transcribed_text, language_used, language_confidence)
+                   The confidence is None when the language was given.
+
+        Raises:
+            BatcherClosed: the batcher was closed
+            TimeoutError: no result within timeout
+        """
+        future = Future()
+        # Nothing is queued behind close()'s marker, so every queued clip is decoded
+        with self.lock:
+            if self.closed:
+                raise BatcherClosed("Whisper batcher is closed")
+            self.queue.put((audio, language, future))
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            future.cancel()  # the scheduler skips it if it has not started
+            raise
+
+    def collect(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def close(self):
+        """Stop the scheduler thread once the queued clips are done"""
+        with self.lock:
+            self.closed = True
+            self.queue.put(None)
+
+    def run(self):
+        closed = False
+        try:
+            while not (closed and self.queue.empty()):
+                batch = self.collect()
+                closed = closed or None in batch
+                self.process([item for item in batch if item is not None])
+        finally:
+            # Only reached early if the scheduler itself failed; no caller may wait forever
+            with self.lock:
+                self.closed = True
+            while not self.queue.empty():
+                item = self.queue.get()
+                if item is not None and item[2].set_running_or_notify_cancel():
+                    item[2].set_exception(BatcherClosed("Whisper batcher stopped"))
+
+    def process(self, batch):
+        # Callers that timed out have cancelled their clips
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        # DecodingOptions.language applies to the whole batch, so clips
+        # with different requested languages are decoded separately
+        groups = {}
+        for item in batch:
+            groups.setdefault(item[1], []).append(item)
+        for language, items in groups.items():
+            self.decode(language, items)
+
+    def decode(self, language, items):
+        try:
+            mel = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=self.model.dims.n_mels)
+                for audio, _, _ in items
+            ]).to(self.model.device)
+            options = whisper.DecodingOptions(language=language, fp16=False, without_timestamps=True)
+            results = whisper.decode(self.model, mel, options)
+        except Exception as e:
+            logger.error(f"Batch decode error: {e}")
+            for _, _, future in items:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.clips += len(items)
+        logger.info(f"Decoded Whisper batch of {len(items)} (language: {language or 'auto'})")
+        for (_, _, future), result in zip(items, results):
+            confidence = result.language_probs[result.language] if result.language_probs else None
+            # Same silence rule model.transcribe() applies per segment
+            if result.no_speech_prob > 0.6 and result.avg_logprob < -1:
+                future.set_result(("", result.language, confidence))
+            else:
+                future.set_result((result.text, result.language, confidence))
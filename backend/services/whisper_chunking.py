@@ -0,0 +1,113 @@
+import os
+import re
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from services.audio_utils import SAMPLE_RATE
+from services.vad import split_at_silences
+
+logger = logging.getLogger(__name__)
+
+# Long-audio mode (environment variables)
+#   WHISPER_CHUNK_WORKERS       processes transcribing the chunks of long clips in
+#                               parallel, each with its own copy of the model (0 = off)
+#   WHISPER_CHUNK_MIN_SECONDS   clips longer than this are split
+#   WHISPER_CHUNK_SECONDS       longest chunk; Whisper decodes 30 s windows
+#   WHISPER_CHUNK_OVERLAP_MS    audio repeated across a cut that falls inside speech
+CHUNK_WORKERS = int(os.getenv("WHISPER_CHUNK_WORKERS", 0))
+MIN_SECONDS = float(os.getenv("WHISPER_CHUNK_MIN_SECONDS", 30))
+CHUNK_SECONDS = float(os.getenv("WHISPER_CHUNK_SECONDS", 30))
+OVERLAP_MS = int(os.getenv("WHISPER_CHUNK_OVERLAP_MS", 1000))
+
+# Longest run of words repeated across an overlapping cut
+MAX_OVERLAP_WORDS = 10
+
+executor = None
+executor_lock = threading.Lock()
+
+# The model of a chunk worker process
+model = None
+
+def init_worker(size, threads):
+    global model
+    import torch
+    torch.set_num_threads(threads)
+    from services import whisper_service
+    model = whisper_service.load_model(size)
+
+def transcribe_chunk(audio, language):
+    # Every chunk is decoded on its own, so there is no previous text to condition on
+    result = model.transcribe(audio, fp16=False, language=language, condition_on_previous_text=False)
+    return result["text"].strip()
+
+def enabled():
+    # Daemon processes (the model server's workers) cannot start children
+    return CHUNK_WORKERS > 0 and not multiprocessing.current_process().daemon
+
+def get_executor(size):
+    global executor
+    with executor_lock:
+        if executor is None:
+            # Share the CPUs between the workers instead of each one using all of them
+            threads = max((os.cpu_count() or 1) // CHUNK_WORKERS, 1)
+            # Spawned rather than forked: torch's thread pools do not survive a fork
+            executor = ProcessPoolExecutor(CHUNK_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+                                           initializer=init_worker, initargs=(size, threads))
+            logger.info(f"Started {CHUNK_WORKERS} Whisper chunk workers ({threads} threads each)")
+        return executor
+
+def shutdown():
+    """Stop the chunk workers, freeing their copies of the model"""
+    global executor
+    with executor_lock:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            executor = None
+
+def normalize(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+def stitch(texts, overlapping):
+    """
+    Join the chunk transcripts in order
+
+    Args:
+        texts: Transcript of each chunk
+        overlapping: For each cut, whether the two chunks share audio
+
+    Returns:
+        str: The transcript, without the words repeated across overlapping cuts
+    """
+    words = texts[0].split() if texts else []
+    for text, overlap in zip(texts[1:], overlapping):
+        following = text.split()
+        if overlap:
+            tail = [normalize(word) for word in words[-MAX_OVERLAP_WORDS:]]
+            head = [normalize(word) for word in following[:MAX_OVERLAP_WORDS]]
+            for size in range(min(len(tail), len(head)), 0, -1):
+                if tail[-size:] == head[:size]:
+                    following = following[size:]
+                    break
+        words.extend(following)
+    return " ".join(words)
+
+def transcribe_long(audio, language, size):
+    """
+    Transcribe a long clip as chunks cut at pauses, in parallel
+
+    Args:
+        audio: float32 samples at 16 kHz
+        language: Language code; detect it beforehand so every chunk uses the same one
+        size: Whisper model size the workers load
+
+    Returns:
+        str: The stitched transcript
+    """
+    chunks = split_at_silences(audio, SAMPLE_RATE, CHUNK_SECONDS, OVERLAP_MS)
+    logger.info(f"Transcribing {len(audio) / SAMPLE_RATE:.1f}s in {len(chunks)} chunks")
+    pool = get_executor(size)
+    futures = [pool.submit(transcribe_chunk, audio[start:end], language) for start, end in chunks]
+    texts = [future.result() for future in futures]
+    overlapping = [end > next_start for (_, end), (next_start, _) in zip(chunks, chunks[1:])]
+    return stitch(texts, overlapping)
@@ -1,243 +1,247 @@
-import re
+import os
+import torch
 import whisper
 import numpy as np
 import sounddevice as sd
+import time
 import logging
+import threading
+from collections import OrderedDict
+from services.audio_utils import to_float32
+from services.whisper_batcher import WhisperBatcher, BatcherClosed, BATCH_TIMEOUT
+from services import whisper_chunking
+from services.engine_config import WHISPER_MODEL_SIZE as MODEL_SIZE, WHISPER_QUANTIZE as QUANTIZE, whisper_model_id as model_id
+from services.model_registry import registry
+from services.vad import Endpointer, trim_silence
+from services.field_extraction import extract_single_field, extract_email_from_speech
 
 logger = logging.getLogger(__name__)
 
-model = None
+# Model size (WHISPER_MODEL) and int8 quantisation (WHISPER_QUANTIZE) are set in
+# services.engine_config, which the API reads without importing torch
 
-def load_model():
-    global model
-    if model is None:
-        logger.info("Loading Whisper model...")
-        model = whisper.load_model("small") #larger models can be used like "base", "small", "medium", "large-v2"
-        logger.info("Whisper model loaded")
-    return model
+# CPU inference (environment variables)
+#   WHISPER_THREADS    torch intra-op threads (0 = torch's default)
+THREADS = int(os.getenv("WHISPER_THREADS", 0))
+if THREADS:
+    torch.set_num_threads(THREADS)
+
+batchers = {}
+batcher_lock = threading.Lock()
+
+# Decode concurrent short clips together (see whisper_batcher). Only useful
+# when the worker pool allows several concurrent Whisper calls in one process.
+BATCHING = os.getenv("WHISPER_BATCHING", "0") == "1"
+
+# Language detected per session (environment variables)
+#   WHISPER_LANGUAGE_CACHE_SIZE        sessions remembered
+#   WHISPER_LANGUAGE_TTL               seconds a session's language is kept
+#   WHISPER_LANGUAGE_MIN_CONFIDENCE    detections below this are not reused
+LANGUAGE_CACHE_SIZE = int(os.getenv("WHISPER_LANGUAGE_CACHE_SIZE", 10000))
+LANGUAGE_TTL = float(os.getenv("WHISPER_LANGUAGE_TTL", 1800))
+LANGUAGE_MIN_CONFIDENCE = float(os.getenv("WHISPER_LANGUAGE_MIN_CONFIDENCE", 0.5))
+
+session_languages = OrderedDict()  # session_id -> (language, confidence, stored_at)
+language_lock = threading.Lock()
+
+def warmup_model(model, size):
+    model.transcribe(np.zeros(16000, dtype=np.float32), fp16=False, language="en")
+
+def model_bytes(model, size):
+    # Quantised layers keep their weights in packed params rather than parameters()
+    total = 0
+    for value in model.state_dict().values():
+        for tensor in value if isinstance(value, tuple) else (value,):
+            if isinstance(tensor, torch.Tensor):
+                total += tensor.numel() * tensor.element_size()
+    return total
+
+def quantize_model(model):
+    """Dynamic int8 quantisation of every linear layer, for CPU inference"""
+    # quantize_dynamic matches module types exactly, so Whisper's Linear
+    # subclass is swapped for a plain nn.Linear sharing the same weights
+    def to_plain_linear(module):
+        for name, child in module.named_children():
+            if isinstance(child, whisper.model.Linear):
+                linear = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                linear.weight, linear.bias = child.weight, child.bias
+                setattr(module, name, linear)
+            else:
+                to_plain_linear(child)
+
+    to_plain_linear(model)
+    return torch.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+def load_whisper(size):
+    if QUANTIZE == "int8":
+        model = quantize_model(whisper.load_model(size, device="cpu"))
+        logger.info(f"Quantised Whisper '{size}' linear layers to int8")
+        return model
+    return whisper.load_model(size)
+
+def unload_model(model, size):
+    # The batcher thread holds a reference to the model, stop it so the weights can be freed
+    with batcher_lock:
+        batcher = batchers.pop(size, None)
+    if batcher is not None:
+        batcher.close()
+    whisper_chunking.shutdown()
+
+registry.register("whisper", load_whisper, warmup=warmup_model, size=model_bytes, unload=unload_model)
+
+def load_model(size=None):
+    return registry.get("whisper", size or MODEL_SIZE)
+
+def get_batcher(size=None):
+    size = size or MODEL_SIZE
+    model = load_model(size)
+    with batcher_lock:
+        if size not in batchers or batchers[size].closed:
+            batchers[size] = WhisperBatcher(model)
+        return batchers[size]
 
 def record_audio(duration=5, sample_rate=16000):
+    """Record until the speaker stops (see services.vad) or for at most duration seconds"""
     try:
         logger.info("Recording audio...")
-        recording = sd.rec(
-            int(duration * sample_rate),
-            samplerate=sample_rate,
-            channels=1,
-            dtype='float32'
-        )
-        sd.wait()
-        return recording.flatten()
+        endpointer = Endpointer(sample_rate)
+        block_size = sample_rate // 10
+        blocks = []
+        with sd.InputStream(samplerate=sample_rate, channels=1, dtype='float32', blocksize=block_size) as stream:
+            for _ in range(int(duration * sample_rate / block_size)):
+                block, _ = stream.read(block_size)
+                blocks.append(block[:, 0])
+                if endpointer.feed(block[:, 0]):
+                    logger.info(f"End of speech after {len(blocks) * block_size / sample_rate:.1f}s")
+                    break
+        return trim_silence(np.concatenate(blocks), sample_rate)
     except Exception as e:
         logger.error(f"Audio recording error: {e}")
         return np.array([])
 
-def listen_and_transcribe(timeout=5, sample_rate=16000, language=None):
+def listen_and_transcribe(timeout=5, sample_rate=16000, language=None, session_id=None):
     """
     Transcribe audio with optional manual language selection
     
     Args:
-        timeout: Recording duration in seconds
+        timeout: Maximum recording duration in seconds
         sample_rate: Audio sample rate
         language: Language code (e.g., 'en', 'es', 'fr', 'de', 'hi', 'zh', etc.)
                  If None, Whisper will auto-detect the language
+        session_id: Form/session identifier; the language detected for its
+                    first field is reused for the following ones
     
     Returns:
-        tuple: (transcribed_text, language_used)
+        tuple: (transcribed_text, language_used, language_confidence)
     """
     try:
         model = load_model()
         audio = record_audio(timeout, sample_rate)
         if audio.size == 0:
-            return "", language or "en"
+            return "", language or "en", None
         
-        # Transcribe with or without language specification
-        if language:
-            logger.info(f"Transcribing with specified language: {language}")
-            result = model.transcribe(audio, fp16=False, language=language)
-            logger.info(f"Whisper Recognition: {result['text']}")
-            logger.info(f"Used Language: {language}")
-            return result['text'], language
-        else:
-            logger.info("Transcribing with auto-detection")
-            result = model.transcribe(audio, fp16=False)
-            logger.info(f"Whisper Recognition: {result['text']}")
-            logger.info(f"Detected Language: {result['language']}")
-            return result['text'], result['language']
+        return transcribe(model, audio, language, session_id)
             
     except Exception as e:
         logger.error(f"Transcription error: {e}")
-        return "", language or "en"
+        return "", language or "en", None
 
-def extract_email_from_speech(transcript):
-    """
-    Extract email from speech transcript with better handling of spoken formats and malformed patterns
+def transcribe_audio(samples, language=None, session_id=None):
     """
-    if not transcript:
-        return ""
-    
-    # Convert to lowercase for processing
-    text = transcript.lower().strip()
-    logger.info(f"Processing email transcript: '{text}'")
-    
-    # First, try to find already properly formatted emails
-    email_pattern = r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b'
-    match = re.search(email_pattern, text)
-    if match:
-        return match.group(0)
-    
-    # Handle malformed patterns like @ther@egmail.com, @john@gmail.com etc.
-    # Look for patterns with multiple @ symbols or garbled text
-    if '@' in text:
-        # Fix common Whisper transcription errors
-        processed_text = text
-        
-        # Fix multiple @ symbols - keep only valid ones
-        # Pattern: @word@domain.com -> word@domain.com  
-        processed_text = re.sub(r'^@([a-zA-Z0-9]+)@', r'\1@', processed_text)
-        
-        # Fix missing letters after @ (common Whisper issue)
-        # @gmail.com -> user@gmail.com (if there's text before @)
-        if processed_text.startswith('@') and not processed_text.startswith('@@'):
-            # Look for word before @ that might be username
-            preceding_word_match = re.search(r'(\w+)\s*@', text)
-            if preceding_word_match:
-                username = preceding_word_match.group(1)
-                processed_text = re.sub(r'^@', f'{username}@', processed_text)
-        
-        # Handle cases like "ther@egmail.com" -> "user@gmail.com"
-        # Fix common domain misspellings
-        domain_fixes = {
-            'egmail': 'gmail',
-            'gmial': 'gmail', 
-            'gmai': 'gmail',
-            'yahooo': 'yahoo',
-            'yahho': 'yahoo',
-            'hotmial': 'hotmail',
-            'hotmeil': 'hotmail',
-            'outlok': 'outlook',
-        }
-        
-        for wrong, correct in domain_fixes.items():
-            processed_text = re.sub(f'@{wrong}', f'@{correct}', processed_text)
-            processed_text = re.sub(f'{wrong}\.com', f'{correct}.com', processed_text)
-        
-        # Try to extract email from processed text
-        match = re.search(email_pattern, processed_text)
-        if match:
-            logger.info(f"Fixed email: '{text}' -> '{match.group(0)}'")
-            return match.group(0)
-    
-    # Handle spoken email formats
-    # Replace common speech-to-text variations
-    replacements = {
-        r'\b(at|at the rate|at the symbol|at sign|add)\b': '@',
-        r'\b(dot|period|full stop|point)\b': '.',
-        r'\b(dash|hyphen|minus)\b': '-',
-        r'\b(underscore|under score)\b': '_',
-        r'\b(plus)\b': '+',
-    }
-    
-    processed_text = text
-    for pattern, replacement in replacements.items():
-        processed_text = re.sub(pattern, replacement, processed_text, flags=re.IGNORECASE)
-    
-    # Remove extra spaces
-    processed_text = re.sub(r'\s+', '', processed_text)
-    
-    # Try to extract email from processed text
-    match = re.search(email_pattern, processed_text)
-    if match:
-        logger.info(f"Extracted email via speech processing: '{match.group(0)}'")
-        return match.group(0)
-    
-    # Last resort: try to build a valid email from parts
-    if '@' in processed_text:
-        # Split by @ and try to construct valid email
-        parts = processed_text.split('@')
-        if len(parts) >= 2:
-            username = parts[0]
-            domain_part = '@'.join(parts[1:])  # Join in case there were multiple @
-            
-            # Clean username (remove non-alphanumeric except . _ -)
-            username = re.sub(r'[^a-zA-Z0-9._-]', '', username)
-            
-            # Clean domain and ensure it has proper format
-            domain_part = re.sub(r'[^a-zA-Z0-9.-]', '', domain_part)
-            
-            # Add .com if no extension present
-            if '.' not in domain_part:
-                domain_part += '.com'
-            
-            potential_email = f"{username}@{domain_part}"
-            
-            # Validate the constructed email
-            if re.match(email_pattern, potential_email):
-                logger.info(f"Constructed valid email: '{potential_email}'")
-                return potential_email
-    
-    # If no email found, return empty string
-    logger.warning(f"Could not extract valid email from: '{transcript}'")
-    return ""
-
-def extract_single_field(transcript, field, language='english'):
-    """
-    Extract specific field from transcript based on language
+    Transcribe audio uploaded by the client instead of recording it
     
     Args:
-        transcript: The transcribed text
-        field: Field to extract (email, candidate_name, years_of_experience, etc.)
-        language: Language of the transcript ('english', 'spanish', 'french', etc.)
+        samples: 16 kHz mono int16 samples
+        language: Language code, or None to auto-detect
+        session_id: Form/session identifier for the language cache
     
     Returns:
-        str: Extracted field value
+        tuple: (transcribed_text, language_used, language_confidence)
     """
-    if not transcript:
-        return ""
-         
     try:
-        # Handle non-English languages - return transcript as-is for now
-        # You can add language-specific patterns later
-        if language not in ['english', 'en']:
-            logger.info(f"Non-English language detected: {language}. Returning transcript as-is.")
-            return transcript
+        model = load_model()
+        if samples.size == 0:
+            return "", language or "en", None
         
-        # Special handling for email (works for English)
-        if field == "email":
-            return extract_email_from_speech(transcript)
-                 
-        patterns = {
-            "candidate_name": [
-                r"(?:my name is|i am|name is|this is|i'm|im)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)",
-                r"^([A-Z][a-z]+\s+[A-Z][a-z]+)$",
-                r"([A-Z][a-z]+ [A-Z][a-z]+)"
-            ],
-            "years_of_experience": [
-                r"(\d+)\s*(?:years|yrs|year|y)",
-                r"experience of (\d+)\s*years",
-                r"(\d+)\s*\+?\s*years? exp",
-                r"(\d+)\s+yoe",
-                r"(\d+)\s+years of experience"
-            ],
-            "current_designation": [
-                r"(?:i am a|my designation is|i work as|i'm a|role is|as a)\s+([a-z ]+)",
-                r"^([a-z ]+)$"
-            ],
-            "address": [
-                r"(?:i live at|my address is|address is|located at|residing at)\s+([a-z0-9, ]+)",
-                r"^([a-z0-9, ]+)$"
-            ]
-        }
-                 
-        for pattern in patterns.get(field, []):
-            match = re.search(pattern, transcript, re.IGNORECASE)
-            if match:
-                value = match.group(1).strip()
-                return value
-                 
-        return transcript
+        return transcribe(model, to_float32(samples), language, session_id)
+            
     except Exception as e:
-        logger.error(f"Extraction error: {str(e)}")
-        return transcript
+        logger.error(f"Transcription error: {e}")
+        return "", language or "en", None
+
+def session_language(session_id):
+    """Return the cached (language, confidence) of a session, or None"""
+    if not session_id:
+        return None
+    with language_lock:
+        entry = session_languages.get(session_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[2] > LANGUAGE_TTL:
+            del session_languages[session_id]
+            return None
+        session_languages.move_to_end(session_id)
+        return entry[0], entry[1]
+
+def remember_language(session_id, language, confidence):
+    # Uncertain detections are not cached so the next field gets another try
+    if not session_id or confidence is None or confidence < LANGUAGE_MIN_CONFIDENCE:
+        return
+    with language_lock:
+        session_languages[session_id] = (language, confidence, time.monotonic())
+        session_languages.move_to_end(session_id)
+        while len(session_languages) > LANGUAGE_CACHE_SIZE:
+            session_languages.popitem(last=False)
+
+def run_model(model, audio, language):
+    # Long clips are cut at pauses and the chunks transcribed in parallel
+    if whisper_chunking.enabled() and audio.shape[0] > whisper_chunking.MIN_SECONDS * whisper.audio.SAMPLE_RATE:
+        return whisper_chunking.transcribe_long(audio, language, MODEL_SIZE)
+    return model.transcribe(audio, fp16=False, language=language)['text']
+
+def detect_language(model, audio):
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=model.dims.n_mels)
+    _, probs = model.detect_language(mel.to(model.device))
+    language = max(probs, key=probs.get)
+    return language, probs[language]
+
+def transcribe(model, audio, language=None, session_id=None):
+    confidence = None
+    if not language:
+        cached = session_language(session_id)
+        if cached:
+            language, confidence = cached
+            logger.info(f"Reusing language {language} ({confidence:.2f}) of session {session_id}")
+
+    if BATCHING and audio.shape[0] <= whisper.audio.N_SAMPLES:
+        try:
+            text, used_language, detected_confidence = get_batcher().transcribe(audio, language, BATCH_TIMEOUT)
+        except BatcherClosed:
+            # The model was unloaded (idle or memory-cap eviction) as the clip arrived; load it again
+            text, used_language, detected_confidence = get_batcher().transcribe(audio, language, BATCH_TIMEOUT)
+        logger.info(f"Whisper Recognition (batched): {text}")
+        logger.info(f"Used Language: {used_language}")
+        if not language:
+            remember_language(session_id, used_language, detected_confidence)
+            confidence = detected_confidence
+        return text, used_language, confidence
+
+    # Transcribe with or without language specification
+    if language:
+        logger.info(f"Transcribing with specified language: {language}")
+        text = run_model(model, audio, language)
+        logger.info(f"Whisper Recognition: {text}")
+        logger.info(f"Used Language: {language}")
+        return text, language, confidence
+    else:
+        logger.info("Transcribing with auto-detection")
+        # Detect explicitly so the confidence can be reported and cached
+        language, confidence = detect_language(model, audio)
+        remember_language(session_id, language, confidence)
+        text = run_model(model, audio, language)
+        logger.info(f"Whisper Recognition: {text}")
+        logger.info(f"Detected Language: {language} ({confidence:.2f})")
+        return text, language, confidence
 
 # Example usage functions
 def get_user_input_with_language():
@@ -278,13 +282,13 @@ def get_user_input_with_language():
     
     if chosen_language and chosen_language in supported_languages.values():
         print(f"Using language: {chosen_language}")
-        transcript, detected_lang = listen_and_transcribe(timeout=5, language=chosen_language)
+        transcript, detected_lang, _ = listen_and_transcribe(timeout=5, language=chosen_language)
     elif chosen_language == "":
         print("Using auto-detection")
-        transcript, detected_lang = listen_and_transcribe(timeout=5)
+        transcript, detected_lang, _ = listen_and_transcribe(timeout=5)
     else:
         print(f"Unknown language code: {chosen_language}. Using auto-detection.")
-        transcript, detected_lang = listen_and_transcribe(timeout=5)
+        transcript, detected_lang, _ = listen_and_transcribe(timeout=5)
     
     print(f"Transcript: {transcript}")
     print(f"Language: {detected_lang}")
@@ -301,9 +305,9 @@ def extract_field_with_language_choice(field_name):
     language_choice = input("Enter language code (en/es/fr/de/hi/zh, or Enter for auto): ").strip()
     
     if language_choice:
-        transcript, used_lang = listen_and_transcribe(timeout=5, language=language_choice)
+        transcript, used_lang, _ = listen_and_transcribe(timeout=5, language=language_choice)
     else:
-        transcript, used_lang = listen_and_transcribe(timeout=5)
+        transcript, used_lang, _ = listen_and_transcribe(timeout=5)
     
     # Extract the field
     extracted_value = extract_single_field(transcript, field_name, used_lang)
@@ -347,7 +351,7 @@ def test_email_extraction():
 # test_email_extraction()
 
 # Example usage:
-# transcript, lang = listen_and_transcribe(language='en')  # Force English
-# transcript, lang = listen_and_transcribe(language='hi')  # Force Hindi  
-# transcript, lang = listen_and_transcribe(language='es')  # Force Spanish
-# transcript, lang = listen_and_transcribe()              # Auto-detect
\ No newline at end of file
+# transcript, lang, confidence = listen_and_transcribe(language='en')  # Force English
+# transcript, lang, confidence = listen_and_transcribe(language='hi')  # Force Hindi  
+# transcript, lang, confidence = listen_and_transcribe(language='es')  # Force Spanish
+# transcript, lang, confidence = listen_and_transcribe()              # Auto-detect
\ No newline at end of file
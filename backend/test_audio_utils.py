@@ -0,0 +1,117 @@
+import subprocess
+import numpy as np
+import pytest
+from services import audio_utils
+from services.audio_utils import (decode_audio, parse_wav, to_16k_mono, resample, AudioFormatError,
+                                  WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_EXTENSIBLE, SAMPLE_RATE)
+
+def wav_bytes(samples, sample_rate, channels=1, tag=WAVE_FORMAT_PCM, extensible=False, extra_chunk=b"", data_size=None):
+    """A WAV file around the given samples, built by hand to cover each header variant"""
+    data = samples.tobytes()
+    bits = samples.dtype.itemsize * 8
+    block = channels * samples.dtype.itemsize
+    fmt = (WAVE_FORMAT_EXTENSIBLE if extensible else tag).to_bytes(2, "little") + channels.to_bytes(2, "little") \
+        + sample_rate.to_bytes(4, "little") + (sample_rate * block).to_bytes(4, "little") \
+        + block.to_bytes(2, "little") + bits.to_bytes(2, "little")
+    if extensible:
+        fmt += (22).to_bytes(2, "little") + bits.to_bytes(2, "little") + bytes(4) + tag.to_bytes(2, "little") + bytes(14)
+    chunks = b"fmt " + len(fmt).to_bytes(4, "little") + fmt + extra_chunk \
+        + b"data" + (len(data) if data_size is None else data_size).to_bytes(4, "little") + data
+    return b"RIFF" + (len(chunks) + 4).to_bytes(4, "little") + b"WAVE" + chunks
+
+def tone(frequency, sample_rate, seconds=0.5):
+    return np.sin(2 * np.pi * frequency * np.arange(int(sample_rate * seconds)) / sample_rate).astype(np.float32)
+
+def peak_frequency(samples, sample_rate):
+    spectrum = np.abs(np.fft.rfft(samples.astype(np.float32)))
+    return np.argmax(spectrum) * sample_rate / samples.size
+
+def test_16k_mono_wav_is_a_view_of_the_upload():
+    samples = np.array([0, 1000, -1000, 32767, -32768], dtype=np.int16)
+    data = wav_bytes(samples, SAMPLE_RATE)
+    decoded = decode_audio(data)
+    assert decoded.tolist() == samples.tolist()
+    assert not decoded.flags.owndata
+
+@pytest.mark.parametrize("samples, expected", [
+    (np.array([128, 255, 0], dtype=np.uint8), [0, 127 << 8, -32768]),
+    (np.array([0, 1000, -1000], dtype=np.int16), [0, 1000, -1000]),
+    (np.array([0, 1000 << 16, -1000 << 16], dtype=np.int32), [0, 1000, -1000]),
+])
+def test_wav_sample_widths(samples, expected):
+    wav = parse_wav(wav_bytes(samples, SAMPLE_RATE))
+    assert wav[1:] == (SAMPLE_RATE, 1)
+    assert decode_audio(wav_bytes(samples, SAMPLE_RATE)).tolist() == expected
+
+def test_float_wav():
+    samples = np.array([0, 0.5, -0.5, 2.0], dtype=np.float32)
+    assert decode_audio(wav_bytes(samples, SAMPLE_RATE, tag=WAVE_FORMAT_IEEE_FLOAT)).tolist() == [0, 16384, -16384, 32767]
+
+def test_extensible_wav_and_unknown_chunks():
+    samples = np.array([5, -5], dtype=np.int16)
+    data = wav_bytes(samples, SAMPLE_RATE, extensible=True, extra_chunk=b"LIST" + (3).to_bytes(4, "little") + b"abc\0")
+    assert decode_audio(data).tolist() == [5, -5]
+
+def test_unsupported_wav_encoding_is_left_to_ffmpeg():
+    samples = np.zeros(4, dtype=np.int16)
+    assert parse_wav(wav_bytes(samples, SAMPLE_RATE, tag=6)) is None  # A-law
+
+def test_streamed_wav_without_data_size_reads_to_the_end():
+    samples = np.arange(10, dtype=np.int16)
+    assert parse_wav(wav_bytes(samples, SAMPLE_RATE, data_size=0xFFFFFFFF))[0].tolist() == samples.tolist()
+
+def test_stereo_wav_is_downmixed():
+    left = np.full(8, 1000, dtype=np.int16)
+    right = np.full(8, 3000, dtype=np.int16)
+    stereo = np.stack([left, right], axis=1).reshape(-1)
+    assert decode_audio(wav_bytes(stereo, SAMPLE_RATE, channels=2)).tolist() == [2000] * 8
+
+def test_trailing_partial_frame_is_dropped():
+    stereo = np.array([100, 300, 100, 300, 100], dtype=np.int16)
+    # A data chunk that ends mid-frame, and the same for raw PCM
+    assert parse_wav(wav_bytes(stereo, SAMPLE_RATE, channels=2))[0].size == 4
+    assert decode_audio(stereo.tobytes() + b"\x01", "audio/pcm;channels=2").tolist() == [200, 200]
+    assert to_16k_mono(stereo, SAMPLE_RATE, 2).tolist() == [200, 200]
+
+def test_l16_is_big_endian():
+    samples = np.array([1, -2, 300, -32768], dtype=np.int16)
+    assert decode_audio(samples.astype(">i2").tobytes(), "audio/L16; rate=16000").tolist() == samples.tolist()
+    assert decode_audio(samples.tobytes(), "audio/pcm").tolist() == samples.tolist()
+
+@pytest.mark.parametrize("content_type", ["audio/pcm;rate=0", "audio/pcm;rate=abc", "audio/pcm;channels=0", "audio/l16;channels=-1"])
+def test_bad_pcm_parameters(content_type):
+    with pytest.raises(AudioFormatError):
+        decode_audio(bytes(8), content_type)
+
+def test_wav_without_sample_rate():
+    with pytest.raises(AudioFormatError):
+        decode_audio(wav_bytes(np.zeros(4, dtype=np.int16), 0))
+
+@pytest.mark.parametrize("error", [FileNotFoundError(), subprocess.CalledProcessError(1, "ffmpeg", stderr=b"Invalid data")])
+def test_undecodable_upload(monkeypatch, error):
+    def run(*args, **kwargs):
+        raise error
+    monkeypatch.setattr(audio_utils.subprocess, "run", run)
+    with pytest.raises(AudioFormatError):
+        decode_audio(b"not audio at all", "audio/wav")
+
+@pytest.mark.parametrize("sample_rate", [8000, 22050, 44100, 48000])
+def test_to_16k_mono_resamples(sample_rate):
+    samples = (tone(440, sample_rate) * 16000).astype(np.int16)
+    resampled = to_16k_mono(samples, sample_rate)
+    assert resampled.dtype == np.int16
+    assert resampled.size == round(samples.size * SAMPLE_RATE / sample_rate)
+    assert abs(peak_frequency(resampled, SAMPLE_RATE) - 440) <= 2
+    assert abs(np.abs(resampled).max() - 16000) < 800
+
+def test_resample_removes_frequencies_above_the_new_nyquist():
+    samples = tone(440, 48000) + tone(12000, 48000)
+    resampled = resample(samples, 48000)
+    spectrum = np.abs(np.fft.rfft(resampled))
+    frequencies = np.fft.rfftfreq(resampled.size, 1 / SAMPLE_RATE)
+    assert spectrum[frequencies > 7000].max() < spectrum.max() * 1e-3
+
+def test_resample_same_rate_and_empty():
+    samples = tone(440, SAMPLE_RATE)
+    assert resample(samples, SAMPLE_RATE) is samples
+    assert resample(np.array([], dtype=np.float32), 44100).size == 0
@@ -0,0 +1,90 @@
+import pytest
+from datetime import date
+from database import create_record, iter_records, get_record_by_id, bulk_create_records, to_bool, to_date, to_years
+
+def test_export_does_not_block_writes():
+    for number in range(5):
+        create_record({"candidate_name": f"Export {number}", "email": f"export{number}@example.com"})
+    records = iter_records(batch_size=2)
+    first = next(records)
+    # The client is still downloading the export; writes must go through
+    record_id = create_record({"candidate_name": "Written during export"})
+    assert get_record_by_id(record_id)["candidate_name"] == "Written during export"
+    rest = list(records)
+    ids = [first["id"]] + [record["id"] for record in rest]
+    assert len(ids) == len(set(ids))
+    assert {f"Export {number}" for number in range(5)} <= {record["candidate_name"] for record in [first] + rest}
+
+def test_export_batches_cover_every_record_once():
+    exported = [record["id"] for record in iter_records(batch_size=3)]
+    assert len(exported) == len(set(exported))
+    assert exported == [record["id"] for record in iter_records(batch_size=1000)]
+
+def test_export_skips_deleted_records():
+    record_id = create_record({"candidate_name": "Deleted", "deleted": True})
+    assert record_id not in {record["id"] for record in iter_records()}
+    assert record_id in {record["id"] for record in iter_records(include_deleted=True)}
+
+@pytest.mark.parametrize("value, expected", [
+    (None, False), (True, True), (False, False), (0, False), (1, True),
+    ("true", True), ("True", True), (" yes ", True), ("1", True),
+    ("false", False), ("FALSE", False), ("no", False), ("0", False), ("", False),
+])
+def test_to_bool(value, expected):
+    assert to_bool(value) is expected
+
+@pytest.mark.parametrize("value", ["maybe", 2, -1, 0.5, [], {}])
+def test_to_bool_rejects(value):
+    with pytest.raises(ValueError):
+        to_bool(value)
+
+def test_to_date():
+    assert to_date("2024-03-01") == date(2024, 3, 1)
+    assert to_date(date(2024, 3, 1)) == date(2024, 3, 1)
+    assert to_date(None) == to_date("") == date.today()
+
+@pytest.mark.parametrize("value", [5, 0, "yesterday", "2024-13-01", 1.5])
+def test_to_date_rejects(value):
+    with pytest.raises((ValueError, TypeError)):
+        to_date(value)
+
+def test_to_years():
+    assert to_years("7") == 7
+    assert to_years(3) == 3
+    assert to_years(None) == to_years("") == 0
+    with pytest.raises(ValueError):
+        to_years("seven")
+
+def test_bulk_import_coerces_and_reports_each_record():
+    result = bulk_create_records([
+        {"candidate_name": "Kept", "deleted": "false", "date": "2024-01-02", "years_of_experience": "4"},
+        {"candidate_name": "Bad date", "date": 5},
+        {"candidate_name": "Bad deleted", "deleted": "perhaps"},
+        {"candidate_name": "Bad years", "years_of_experience": "many"},
+        {"candidate_name": "Unknown", "salary": 10},
+        "not an object",
+    ])
+    assert result["created"] == 1
+    assert [(error["index"], error["error"]) for error in result["errors"]] == [
+        (1, "Invalid date: 5"),
+        (2, "Invalid deleted: 'perhaps'"),
+        (3, "Invalid years_of_experience: 'many'"),
+        (4, "Unknown fields: salary"),
+        (5, "Record must be a JSON object"),
+    ]
+    record = get_record_by_id(result["ids"][0])
+    assert record["date"] == "2024-01-02" and record["years_of_experience"] == 4
+    assert result["ids"][0] in {record["id"] for record in iter_records()}  # not imported as deleted
+
+def test_bulk_import_falls_back_to_single_rows_on_a_duplicate_id():
+    existing = create_record({"candidate_name": "Existing"})
+    result = bulk_create_records([
+        {"candidate_name": "First"},
+        {"id": existing, "candidate_name": "Duplicate"},
+        {"candidate_name": "Third"},
+    ], batch_size=10)
+    assert result["created"] == 2
+    assert [error["index"] for error in result["errors"]] == [1]
+    assert "UNIQUE" in result["errors"][0]["error"]
+    assert get_record_by_id(existing)["candidate_name"] == "Existing"
+    assert {get_record_by_id(record_id)["candidate_name"] for record_id in result["ids"]} == {"First", "Third"}
@@ -0,0 +1,51 @@
+import pytest
+from services.domain_index import DeletionIndex, edit_distance, correct_email_domain
+from services.field_extraction import extract_single_field
+
+@pytest.mark.parametrize("email", [
+    "anna@company.ch",
+    "juan@empresa.es",
+    "x@uni.at",
+    "someone@startup.dev",
+    "a@mail.company.de",
+    "b@dept.uni.ac.uk",
+    "x@yahoo.co.uk",
+    "x@hotmail.co.uk",
+    "x@proton.ch",
+])
+def test_real_tlds_are_kept(email):
+    assert correct_email_domain(email) == email
+
+@pytest.mark.parametrize("spoken, expected", [
+    ("hans at web dot de", "hans@web.de"),
+    ("ali at firm dot pk", "ali@firm.pk"),
+    ("email is sara at yahoo dot co dot uk", "sara@yahoo.co.uk"),
+])
+def test_spoken_addresses_with_real_tlds_are_kept(spoken, expected):
+    assert extract_single_field(spoken, "email") == expected
+
+@pytest.mark.parametrize("email, expected", [
+    ("john@gmial.com", "john@gmail.com"),
+    ("john@hotmal.com", "john@hotmail.com"),
+    ("john@yahoo.co.inn", "john@yahoo.co.in"),
+    ("john@company.comm", "john@company.com"),
+    ("john@mail.company.orgg", "john@mail.company.org"),
+])
+def test_misheard_domains_are_corrected(email, expected):
+    assert correct_email_domain(email) == expected
+
+def test_unknown_domain_with_known_tld_is_unchanged():
+    assert correct_email_domain("jane@acmecorp.com") == "jane@acmecorp.com"
+
+def test_without_at_sign_is_unchanged():
+    assert correct_email_domain("not an email") == "not an email"
+
+def test_edit_distance():
+    assert edit_distance("gmail", "gmial") == 2
+    assert edit_distance("com", "comm") == 1
+    assert edit_distance("", "abc") == 3
+
+def test_deletion_index_search():
+    index = DeletionIndex(["gmail.com", "hotmail.com"], max_distance=2)
+    assert index.search("gmai.com", 1) == [(1, "gmail.com")]
+    assert index.search("outlook.com", 2) == []
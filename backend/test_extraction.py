@@ -0,0 +1,106 @@
+import importlib
+import pytest
+from services.field_extraction import clean_email, extract_single_field, extract_all_fields, match_field, FORM_FIELDS
+
+@pytest.mark.parametrize("spoken, expected", [
+    ("john dot smith at gmail dot com", "john.smith@gmail.com"),
+    ("Jane under score doe at yahoo dot co dot in", "jane_doe@yahoo.co.in"),
+    ("a  at at b dot dot com", "a@b.com"),
+    ("first dash last at the rate company dot org", "first-last@company.org"),
+    ("", ""),
+])
+def test_clean_email(spoken, expected):
+    assert clean_email(spoken) == expected
+
+@pytest.mark.parametrize("transcript, expected", [
+    ("my email is john dot smith at gmail dot com", "john.smith@gmail.com"),
+    ("JOHN AT GMAIL DOT COM", "john@gmail.com"),  # lower-cased, whichever engine produced it
+    ("contact me at priya at outlook dot com", "priya@outlook.com"),
+    ("john@gmial.com", "john@gmail.com"),
+    ("hans at web dot de", "hans@web.de"),
+])
+def test_email(transcript, expected):
+    assert extract_single_field(transcript, "email") == expected
+
+def test_email_not_found_is_empty():
+    assert extract_single_field("hello there", "email") == ""
+    assert match_field("hello there", "email") is None
+
+@pytest.mark.parametrize("transcript, field, expected", [
+    ("my name is John Smith", "candidate_name", "John Smith"),
+    ("I have 5 years of experience", "years_of_experience", "5"),
+    ("experience of 12 years", "years_of_experience", "12"),
+    ("i work as software engineer", "current_designation", "software engineer"),
+    ("my address is 12 baker street, london", "address", "12 baker street, london"),
+])
+def test_single_field(transcript, field, expected):
+    assert extract_single_field(transcript, field) == expected
+
+def test_unparsed_field_falls_back_to_transcript():
+    assert extract_single_field("i have five years", "years_of_experience") == "i have five years"
+    assert match_field("i have five years", "years_of_experience") is None
+
+def test_non_english_transcript_is_returned_whole():
+    assert extract_single_field("mera naam Rahul", "candidate_name", "hi") == "mera naam Rahul"
+
+def test_empty_transcript():
+    assert extract_single_field("", "candidate_name") == ""
+    assert match_field("", "candidate_name") is None
+
+def test_whole_form():
+    fields = extract_all_fields("my name is priya sharma i have seven years of experience "
+                                "i work as a data analyst and my email is priya at outlook dot com")
+    assert {field: value["value"] for field, value in fields.items()} == {
+        "candidate_name": "Priya Sharma",
+        "years_of_experience": "7",
+        "current_designation": "data analyst",
+        "address": "",
+        "email": "priya@outlook.com",
+    }
+    assert fields["address"]["confidence"] == 0
+    assert all(fields[field]["confidence"] > 0 for field in FORM_FIELDS if field != "address")
+
+def test_whole_form_digits_and_address():
+    fields = extract_all_fields("I am Ravi Kumar, I have 3 years of experience, my address is 5 park road")
+    assert fields["candidate_name"]["value"] == "Ravi Kumar"
+    assert fields["years_of_experience"] == {"value": "3", "confidence": 0.95}
+    assert fields["address"]["value"] == "5 park road"
+
+def test_whole_form_values_end_at_connectives():
+    fields = extract_all_fields("My name is Anita Rao and I have been working as a data scientist for three years")
+    assert fields["candidate_name"] == {"value": "Anita Rao", "confidence": 0.9}
+    assert fields["current_designation"] == {"value": "data scientist", "confidence": 0.85}
+    assert fields["years_of_experience"]["value"] == "3"
+
+def test_whole_form_designation_ends_at_with():
+    fields = extract_all_fields("i work as a software engineer with five years of experience")
+    assert fields["current_designation"]["value"] == "software engineer"
+    assert fields["years_of_experience"]["value"] == "5"
+
+@pytest.mark.parametrize("transcript, field", [
+    ("i am working as a software engineer", "candidate_name"),
+    ("my name is priya sharma kapoor singh rao", "candidate_name"),
+    ("i work as a 5 star cook", "current_designation"),
+])
+def test_whole_form_implausible_values_have_no_confidence(transcript, field):
+    # service=auto escalates to Whisper on these
+    assert extract_all_fields(transcript)[field]["confidence"] == 0
+
+def test_name_ends_at_connective():
+    assert match_field("My name is Anita Rao and I have been working", "candidate_name") == "Anita Rao"
+
+def test_whole_form_non_english_is_empty():
+    fields = extract_all_fields("my name is ravi", "hi")
+    assert set(fields) == set(FORM_FIELDS)
+    assert all(value == {"value": "", "confidence": 0.0} for value in fields.values())
+
+@pytest.mark.parametrize("engine, dependency", [
+    ("google", "speech_recognition"),
+    ("whisper", "whisper"),
+    ("vosk", "vosk"),
+])
+def test_engines_share_the_extractor(engine, dependency):
+    pytest.importorskip(dependency)
+    from services import field_extraction
+    service = importlib.import_module(f"services.{engine}_service")
+    assert service.extract_single_field is field_extraction.extract_single_field
@@ -0,0 +1,48 @@
+import sys
+import json
+import asyncio
+import subprocess
+import httpx
+import main
+
+def post_bulk(body, content_type):
+    async def post():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/records/bulk", content=body, headers={"Content-Type": content_type})
+    return asyncio.run(post())
+
+def test_cache_key_model():
+    assert main.engine_model("whisper", "en") == main.whisper_model_id()
+    assert main.engine_model("vosk", "en") == "vosk-model-en-in-0.5"
+    assert main.engine_model("vosk", "mr") == "vosk-model-hi-0.22"
+    assert main.engine_model("google", "en") == "google"
+
+def test_cache_key_model_does_not_import_engines():
+    # In a fresh process, since other tests import the engines on purpose
+    probe = ("import sys, main; main.engine_model('whisper', 'en'); main.engine_model('vosk', 'en'); "
+             "print(','.join(name for name in ('services.whisper_service', 'services.vosk_service', "
+             "'torch', 'whisper', 'vosk', 'pyaudio') if name in sys.modules))")
+    imported = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+    assert imported.strip() == ""
+
+def test_ndjson_import_reports_errors_by_line():
+    lines = [
+        json.dumps({"candidate_name": "One"}),
+        "",  # blank lines are skipped and not counted
+        "{not json",
+        json.dumps({"candidate_name": "Two", "date": 5}),
+        json.dumps({"candidate_name": "Three"}),
+    ]
+    response = post_bulk("\n".join(lines), "application/x-ndjson")
+    assert response.status_code == 200
+    result = response.json()
+    assert result["created"] == 2
+    errors = {error["index"]: error["error"] for error in result["errors"]}
+    assert set(errors) == {1, 2}
+    assert errors[1].startswith("Invalid JSON")
+    assert errors[2] == "Invalid date: 5"
+
+def test_json_import_must_be_an_array():
+    assert post_bulk(json.dumps({"candidate_name": "One"}), "application/json").status_code == 400
+    assert post_bulk("[{", "application/json").status_code == 400
@@ -0,0 +1,122 @@
+import os
+import math
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration (environment variables)
+#   STT_POOL                  "thread" or "process"
+#   STT_MAX_WORKERS           number of workers running engine calls
+#   STT_MAX_QUEUE             requests allowed to wait once all workers are busy
+#   STT_REQUEST_TIMEOUT       seconds before a request gives up with 504
+#   STT_ENGINE_CONCURRENCY    per-engine limits, e.g. "whisper=1,vosk=4,google=8"
+POOL_TYPE = os.getenv("STT_POOL", "thread")
+MAX_WORKERS = int(os.getenv("STT_MAX_WORKERS", os.cpu_count() or 4))
+MAX_QUEUE = int(os.getenv("STT_MAX_QUEUE", 16))
+REQUEST_TIMEOUT = float(os.getenv("STT_REQUEST_TIMEOUT", 60))
+
+def parse_limits(value):
+    limits = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, limit = item.partition("=")
+        limits[name.strip()] = int(limit)
+    return limits
+
+ENGINE_LIMITS = parse_limits(os.getenv("STT_ENGINE_CONCURRENCY", "whisper=1,vosk=4,google=8"))
+
+class PoolSaturated(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Server is busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+class WorkerPool:
+    """
+    Runs blocking engine calls off the event loop
+
+    Requests are admitted while fewer than max_workers + max_queue are in the
+    system and are then limited per engine. Once saturated, submit() raises
+    PoolSaturated with a Retry-After estimate based on queue depth and the
+    average call duration.
+    """
+
+    def __init__(self, pool_type=POOL_TYPE, max_workers=MAX_WORKERS, max_queue=MAX_QUEUE,
+                 engine_limits=ENGINE_LIMITS, timeout=REQUEST_TIMEOUT):
+        executor_cls = ProcessPoolExecutor if pool_type == "process" else ThreadPoolExecutor
+        self.executor = executor_cls(max_workers=max_workers)
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.engine_limits = engine_limits
+        self.timeout = timeout
+        self.semaphores = {}
+        self.admitted = 0
+        self.running = 0
+        self.avg_duration = 1.0
+        logger.info(f"Worker pool: {pool_type} x{max_workers}, queue {max_queue}, limits {engine_limits}")
+
+    def stats(self):
+        return {
+            "workers": self.max_workers,
+            "running": self.running,
+            "queued": self.admitted - self.running,
+            "max_queue": self.max_queue,
+            "avg_duration": round(self.avg_duration, 3),
+        }
+
+    def retry_after(self):
+        queued = max(self.admitted - self.max_workers, 1)
+        return max(1, math.ceil(queued * self.avg_duration / self.max_workers))
+
+    def semaphore(self, engine):
+        if engine not in self.semaphores:
+            limit = self.engine_limits.get(engine, self.max_workers)
+            self.semaphores[engine] = asyncio.Semaphore(limit)
+        return self.semaphores[engine]
+
+    async def submit(self, engine, fn, *args, timeout=None):
+        """Run fn(*args) in the pool, honouring the queue bound, engine limit and timeout (default: the pool's)"""
+        # All bookkeeping happens on the event loop thread, so no locking is needed
+        if self.admitted >= self.max_workers + self.max_queue:
+            raise PoolSaturated(self.retry_after())
+        self.admitted += 1
+
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        semaphore = self.semaphore(engine)
+        acquired = False
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout)
+            acquired = True
+            started = time.monotonic()
+            future = loop.run_in_executor(self.executor, fn, *args)
+            self.running += 1
+        except BaseException:
+            if acquired:
+                semaphore.release()
+            self.admitted -= 1
+            raise
+
+        def finished(_):
+            # Release only once the worker is really done so a timed-out call
+            # keeps counting against the limits until it stops running
+            self.running -= 1
+            self.admitted -= 1
+            self.avg_duration = 0.8 * self.avg_duration + 0.2 * (time.monotonic() - started)
+            semaphore.release()
+
+        future.add_done_callback(finished)
+        return await asyncio.wait_for(asyncio.shield(future), max(deadline - loop.time(), 0))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+pool = None
+
+def get_pool():
+    global pool
+    if pool is None:
+        pool = WorkerPool()
+    return pool
@@ -8,6 +8,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const addressField = document.getElementById('address-field');
     const emailField = document.getElementById('email-field');
     const submitBtn = document.getElementById('submit-btn');
+    const recordFormBtn = document.getElementById('record-form-btn');
     const resetBtn = document.getElementById('reset-btn');
     const confirmationModal = document.getElementById('confirmation-modal');
     const confirmName = document.getElementById('confirm-name');
@@ -50,10 +51,13 @@ document.addEventListener('DOMContentLoaded', () => {
     let totalPages = 1;
     let allRecords = [];
     let filteredRecords = [];
+    let recordsPageSize = null;
     
     // Recording state
     let isRecording = false;
     let currentRecordingBtn = null;
+    // One session per form so Whisper detects the language once for all fields
+    let sessionId = crypto.randomUUID();
     
     // Initialize
     updateStatus('Ready to record. Select a field and click Record.');
@@ -80,17 +84,22 @@ document.addEventListener('DOMContentLoaded', () => {
             updateStatus(`Recording for ${field.replace('_', ' ')}...`);
             
             try {
-                const response = await fetch(
-                    `http://localhost:8000/transcribe-field?service=${service}&field=${field}`, 
-                    { method: 'POST' }
-                );
-                
-                if (!response.ok) {
-                    const errorData = await response.json();
-                    throw new Error(errorData.detail || `Server error: ${response.status}`);
+                let data;
+                if (service === 'vosk-stream') {
+                    data = await streamField(field);
+                } else {
+                    const response = await fetch(
+                        `http://localhost:8000/transcribe-field?service=${service}&field=${field}&session_id=${sessionId}`, 
+                        { method: 'POST' }
+                    );
+                    
+                    if (!response.ok) {
+                        const errorData = await response.json();
+                        throw new Error(errorData.detail || `Server error: ${response.status}`);
+                    }
+                    
+                    data = await response.json();
                 }
-                
-                const data = await response.json();
                 updateField(field, data.value);
                 updateTranscript(field, data.transcript);
                 updateStatus(`Successfully captured ${field.replace('_', ' ')}`, 'success');
@@ -108,6 +117,50 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     });
     
+    recordFormBtn.addEventListener('click', async () => {
+        if (isRecording) return;
+        
+        // The whole-form endpoint takes one recording, so live streaming falls back to plain Vosk
+        const service = serviceSelect.value === 'vosk-stream' ? 'vosk' : serviceSelect.value;
+        isRecording = true;
+        recordFormBtn.classList.add('recording');
+        recordFormBtn.innerHTML = '<i class="fas fa-circle"></i> Recording...';
+        updateStatus('Say your name, experience, designation, address and email...');
+        
+        try {
+            const response = await fetch(
+                `http://localhost:8000/transcribe-form?service=${service}&session_id=${sessionId}`,
+                { method: 'POST' }
+            );
+            
+            if (!response.ok) {
+                const errorData = await response.json();
+                throw new Error(errorData.detail || `Server error: ${response.status}`);
+            }
+            
+            const data = await response.json();
+            const captured = [];
+            Object.entries(data.fields).forEach(([field, result]) => {
+                if (result.value) {
+                    updateField(field, result.value);
+                    captured.push(field.replace(/_/g, ' '));
+                }
+            });
+            updateTranscript('candidate_name', data.transcript);
+            updateStatus(
+                captured.length ? `Captured ${captured.join(', ')}` : 'No fields recognised, please try again',
+                captured.length ? 'success' : 'warning'
+            );
+        } catch (err) {
+            updateStatus(`Error: ${err.message}`, 'error');
+            console.error(err);
+        } finally {
+            isRecording = false;
+            recordFormBtn.classList.remove('recording');
+            recordFormBtn.innerHTML = '<i class="fas fa-microphone"></i> Record Whole Form';
+        }
+    });
+    
     submitBtn.addEventListener('click', () => {
         // Validate form
         if (!nameField.value || !emailField.value) {
@@ -236,6 +289,67 @@ document.addEventListener('DOMContentLoaded', () => {
     });
     
     // Functions
+    async function streamField(field, duration = 5000) {
+        // Capture the browser microphone and stream 16-bit PCM to the Vosk WebSocket,
+        // filling the field with partial results while the user is still speaking
+        const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+        const audioContext = new AudioContext();
+        const source = audioContext.createMediaStreamSource(stream);
+        const processor = audioContext.createScriptProcessor(4096, 1, 1);
+        const socket = new WebSocket(
+            `ws://localhost:8000/ws/transcribe?field=${field}&sample_rate=${audioContext.sampleRate}`
+        );
+        socket.binaryType = 'arraybuffer';
+        
+        const stopCapture = () => {
+            processor.disconnect();
+            source.disconnect();
+            stream.getTracks().forEach(track => track.stop());
+            audioContext.close();
+        };
+        
+        return new Promise((resolve, reject) => {
+            let heard = '';
+            
+            socket.onopen = () => {
+                processor.onaudioprocess = (e) => {
+                    const samples = e.inputBuffer.getChannelData(0);
+                    const pcm = new Int16Array(samples.length);
+                    for (let i = 0; i < samples.length; i++) {
+                        pcm[i] = Math.max(-1, Math.min(1, samples[i])) * 0x7fff;
+                    }
+                    if (socket.readyState === WebSocket.OPEN) socket.send(pcm.buffer);
+                };
+                source.connect(processor);
+                processor.connect(audioContext.destination);
+                
+                setTimeout(() => {
+                    stopCapture();
+                    if (socket.readyState === WebSocket.OPEN) socket.send('end');
+                }, duration);
+            };
+            
+            socket.onmessage = (e) => {
+                const message = JSON.parse(e.data);
+                if (message.type === 'partial') {
+                    updateField(field, `${heard} ${message.text}`.trim());
+                } else if (message.type === 'result') {
+                    heard = `${heard} ${message.text}`.trim();
+                    updateField(field, heard);
+                } else if (message.type === 'final') {
+                    resolve(message);
+                } else if (message.type === 'error') {
+                    reject(new Error(message.detail));
+                }
+            };
+            
+            socket.onerror = () => {
+                stopCapture();
+                reject(new Error('Streaming connection failed'));
+            };
+        });
+    }
+    
     function updateField(field, value) {
         switch (field) {
             case 'candidate_name':
@@ -284,6 +398,7 @@ document.addEventListener('DOMContentLoaded', () => {
     }
     
     function resetForm() {
+        sessionId = crypto.randomUUID();
         nameField.value = '';
         expField.value = '';
         designationField.value = '';
@@ -300,18 +415,42 @@ document.addEventListener('DOMContentLoaded', () => {
         updateStatus('Form has been reset');
     }
     
+    async function getRecordsPageSize() {
+        // Largest page the server allows (STT_MAX_PAGE_SIZE), asked once
+        if (recordsPageSize === null) {
+            const response = await fetch('http://localhost:8000/');
+            const health = response.ok ? await response.json() : {};
+            recordsPageSize = health.max_page_size || 50;
+        }
+        return recordsPageSize;
+    }
+    
     async function loadRecords() {
         updateStatus('Loading records...');
         
         try {
-            const response = await fetch('http://localhost:8000/records');
-            
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.detail || `Server error: ${response.status}`);
-            }
+            // The API is paginated; walk the pages so search still covers every record
+            const records = [];
+            const pageSize = await getRecordsPageSize();
+            let cursor = null;
+            do {
+                const url = new URL('http://localhost:8000/records');
+                url.searchParams.set('limit', String(pageSize));
+                if (cursor) url.searchParams.set('cursor', cursor);
+                
+                const response = await fetch(url);
+                
+                if (!response.ok) {
+                    const errorData = await response.json();
+                    throw new Error(errorData.detail || `Server error: ${response.status}`);
+                }
+                
+                const page = await response.json();
+                records.push(...page.items);
+                cursor = page.next_cursor;
+            } while (cursor);
             
-            allRecords = await response.json();
+            allRecords = records;
             applySearchFilter();
             calculatePagination();
             renderRecords();